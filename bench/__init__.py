@@ -0,0 +1 @@
+"""Benchmarks headless do iFood Genius (ver `bench/run.py`)."""
@@ -0,0 +1,215 @@
+"""
+Benchmark headless (sem Streamlit) dos caminhos quentes de cada aba.
+  python -m bench.run --sizes 10k,1m                  # roda e salva bench/results/<commit>.json
+  python -m bench.run --cases csv_load,top_item       # só alguns casos
+  python -m bench.run --compare antes.json depois.json  # aponta regressões (exit 1)
+
+Casos: carga do CSV (e do espelho Parquet, se houver pyarrow), item campeão, favorito por cliente,
+contexto do chat (agregado e BM25), regras locais de urgência e triagem com modelo fake de latência
+fixa (com e sem deduplicação). Reporta throughput e pico de memória (tracemalloc).
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+import numpy as np
+from bench.synth import generate as synth, parse_size
+from genius import columnar
+from genius.data import CsvTable, SALES_DTYPES, SUPPORT_DTYPES
+from genius.fake import FakeModel
+from genius.rules import classify
+from genius.retrieval import Bm25Index, order_docs, answer_from_aggregates
+from genius.sales_index import SalesIndex
+from genius.triage import TriageEngine
+
+RESULTS_DIR = "bench/results"
+CHAT_QUESTIONS = ["Faturamento total?", "Melhor cliente?", "Produto mais vendido?", "top 5 clientes"]
+FREE_QUESTIONS = ["pedidos com sushi", "o que o Cliente 42 pediu", "pizza grande com refri", "açaí e brownie"]
+
+
+class Context:
+    """Dados de um tamanho, carregados sob demanda e reaproveitados entre os casos."""
+
+    def __init__(self, n, triage_max, triage_latency):
+        self.n = n
+        self.sales_path, self.support_path = synth(n)
+        self.triage_max = triage_max
+        self.triage_latency = triage_latency
+        self._df = self._idx = self._tickets = None
+
+    @property
+    def df(self):
+        if self._df is None: self._df = CsvTable(self.sales_path, SALES_DTYPES).load()
+        return self._df
+
+    @property
+    def idx(self):
+        if self._idx is None:
+            self._idx = SalesIndex()
+            self._idx.update(self.df)
+        return self._idx
+
+    @property
+    def tickets(self):
+        if self._tickets is None:
+            t = CsvTable(self.support_path, SUPPORT_DTYPES).load().head(self.triage_max)
+            self._tickets = list(zip(t['id_ticket'], t['mensagem_cliente']))
+        return self._tickets
+
+
+# Cada caso: setup(ctx) fora do cronômetro -> estado; run(estado) cronometrado -> itens processados
+
+def csv_load(ctx):
+    return None, lambda _: len(CsvTable(ctx.sales_path, SALES_DTYPES).load())
+
+
+def parquet_load(ctx):
+    # Carga a frio de um processo novo: o espelho já convertido, só as colunas do índice de vendas
+    store = os.path.join(columnar.STORE_DIR, "bench")
+    columnar.ParquetTable(ctx.sales_path, SALES_DTYPES, store).load()
+    cols = ['id_pedido', 'cliente', 'itens_lista']
+    return None, lambda _: len(columnar.ParquetTable(ctx.sales_path, SALES_DTYPES, store).load(cols))
+
+
+def top_item(ctx):
+    df = ctx.df
+    def run(_):
+        idx = SalesIndex()
+        idx.update(df)
+        assert idx.top_item
+        return len(df)
+    return None, run
+
+
+def favorite(ctx):
+    idx = ctx.idx
+    rng = np.random.default_rng(0)
+    clientes = list(idx.favorites)
+    sample = [clientes[i] for i in rng.integers(0, len(clientes), 10_000)]
+    return sample, lambda s: sum(idx.favorite(c) is not None for c in s)
+
+
+def chat_aggregate(ctx):
+    answer_from_aggregates(CHAT_QUESTIONS[0], ctx.sales_path)  # aquece o registro de tabelas
+    return None, lambda _: sum(answer_from_aggregates(q, ctx.sales_path) is not None for q in CHAT_QUESTIONS)
+
+
+def chat_retrieval(ctx):
+    df = ctx.df
+    def run(_):
+        bm = Bm25Index()
+        bm.add(order_docs(df))
+        for q in FREE_QUESTIONS: bm.search(q)
+        return len(df)
+    return None, run
+
+
+def triage(ctx):
+    tickets = ctx.tickets
+    def run(_):
+        engine = TriageEngine(FakeModel(latency=ctx.triage_latency), max_workers=16, batch_size=10, backoff=0.01)
+        return sum(r['ok'] for r in engine.run(tickets))
+    return None, run
+
+
+def urgency_rules(ctx):
+    msgs = [m for _, m in ctx.tickets]
+    return None, lambda _: len([classify(m) for m in msgs])
+
+
+def triage_dedup(ctx):
+    # Mesma fila com agrupamento de quase-duplicatas: só os representantes chamam o modelo
+    tickets = ctx.tickets
+    def run(_):
+        engine = TriageEngine(FakeModel(latency=ctx.triage_latency), max_workers=16, batch_size=10, backoff=0.01,
+                              dedup_threshold=0.8)
+        return sum(r['ok'] for r in engine.run(tickets))
+    return None, run
+
+
+CASES = {f.__name__: f for f in (csv_load, parquet_load, top_item, favorite, chat_aggregate, chat_retrieval, triage,
+                                 triage_dedup, urgency_rules)
+         if f is not parquet_load or columnar.available()}
+
+
+def measure(case, ctx, repeat=1, mem=True):
+    state, run = case(ctx)
+    best, items = None, 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        items = run(state)
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    peak = None
+    if mem:
+        # Rodada separada: o tracemalloc distorce o tempo
+        tracemalloc.start()
+        run(state)
+        peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        tracemalloc.stop()
+    return {'seconds': round(best, 4), 'items': items, 'items_per_s': round(items / best, 1) if best else None,
+            'peak_mb': round(peak, 1) if peak is not None else None}
+
+
+def git_commit():
+    try: return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError): return "local"
+
+
+def run_suite(sizes, cases, repeat=1, mem=True, triage_max=2000, triage_latency=0.05):
+    results = []
+    for label in sizes:
+        ctx = Context(parse_size(label), triage_max, triage_latency)
+        for name in cases:
+            r = {'case': name, 'size': label, **measure(CASES[name], ctx, repeat, mem)}
+            print(f"{label:>5} {name:<15} {r['seconds']:>9.4f}s {r['items_per_s'] or 0:>14,.0f} itens/s"
+                  f"  pico {r['peak_mb'] if r['peak_mb'] is not None else '-'} MB", flush=True)
+            results.append(r)
+    return {'meta': {'commit': git_commit(), 'date': time.strftime("%Y-%m-%d %H:%M:%S"),
+                     'python': platform.python_version()}, 'results': results}
+
+
+def compare(base, new, threshold=0.10):
+    """Imprime a variação por (caso, tamanho) e devolve as regressões acima de `threshold`."""
+    old = {(r['case'], r['size']): r for r in base['results']}
+    regressions = []
+    print(f"{base['meta']['commit']} -> {new['meta']['commit']}")
+    for r in new['results']:
+        o = old.get((r['case'], r['size']))
+        if not o or not o['seconds']: continue
+        delta = r['seconds'] / o['seconds'] - 1
+        flag = "REGRESSÃO" if delta > threshold else ("melhora" if delta < -threshold else "")
+        print(f"{r['size']:>5} {r['case']:<15} {o['seconds']:>9.4f}s -> {r['seconds']:>9.4f}s {delta:+7.1%} {flag}")
+        if delta > threshold: regressions.append((r['case'], r['size'], delta))
+    return regressions
+
+
+def _load(path):
+    with open(path, encoding="utf-8") as f: return json.load(f)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Benchmark headless dos caminhos quentes do iFood Genius.")
+    ap.add_argument("--sizes", default="10k", help="10k,1m,10m ou número de linhas")
+    ap.add_argument("--cases", default=",".join(CASES))
+    ap.add_argument("--repeat", type=int, default=3, help="rodadas por caso (vale a mais rápida)")
+    ap.add_argument("--no-mem", action="store_true", help="pula a rodada de pico de memória")
+    ap.add_argument("--triage-max", type=int, default=2000, help="tickets por rodada de triagem")
+    ap.add_argument("--triage-latency", type=float, default=0.05, help="latência fixa do modelo fake (s)")
+    ap.add_argument("--out", help="arquivo JSON de saída (padrão: bench/results/<commit>.json)")
+    ap.add_argument("--compare", nargs="+", metavar="JSON", help="base [novo]: sem 'novo', roda a suíte agora")
+    ap.add_argument("--threshold", type=float, default=0.10, help="lentidão relativa que conta como regressão")
+    a = ap.parse_args()
+
+    if a.compare and len(a.compare) == 2:
+        sys.exit(1 if compare(_load(a.compare[0]), _load(a.compare[1]), a.threshold) else 0)
+    res = run_suite(a.sizes.split(","), a.cases.split(","), a.repeat, not a.no_mem, a.triage_max, a.triage_latency)
+    out = a.out or os.path.join(RESULTS_DIR, f"{res['meta']['commit']}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f: json.dump(res, f, indent=2, ensure_ascii=False)
+    print(f"-> {out}")
+    if a.compare: sys.exit(1 if compare(_load(a.compare[0]), res, a.threshold) else 0)
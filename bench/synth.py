@@ -0,0 +1,86 @@
+"""
+Geradores de dados sintéticos no formato dos CSVs do app.
+  python -m bench.synth --sizes 10k,1m,10m
+Gera `bench/data/vendas_<n>.csv` e `bench/data/suporte_<n>.csv` (em blocos, memória constante).
+"""
+import argparse
+import os
+import numpy as np
+import pandas as pd
+
+DATA_DIR = "bench/data"
+CHUNK = 1_000_000
+
+MENU = ["Hamburguer", "Cheeseburguer", "Batata Frita", "Refri", "Suco", "Milkshake", "Pizza M", "Pizza G",
+        "Sushi Combo", "Temaki", "Yakisoba", "Açaí", "Pastel", "Coxinha", "Salada", "Poke", "Lasanha",
+        "Frango Grelhado", "Parmegiana", "Brownie", "Sorvete", "Água", "Cerveja", "Hot Dog", "Wrap"]
+
+TICKETS = ["Meu lanche chegou completamente revirado e frio. Quero meu dinheiro de volta AGORA!",
+           "O entregador foi super educado, queria deixar um elogio.",
+           "Onde eu insiro o cupom de primeira compra? Não estou achando.",
+           "A carne do hambúrguer veio crua. Isso é um absurdo, risco de saúde!",
+           "Minha filha passou mal depois de comer o yakisoba de vocês. Urgente.",
+           "O pedido atrasou mais de uma hora.", "Veio faltando a batata frita.",
+           "Lanche chegou frio de novo.", "Cobraram a taxa de entrega duas vezes.",
+           "Adorei a pizza, parabéns!", "O refrigerante veio quente.", "Pedido entregue no endereço errado."]
+
+SIZES = {"10k": 10_000, "1m": 1_000_000, "10m": 10_000_000}
+
+
+def parse_size(label):
+    label = label.strip().lower()
+    return SIZES[label] if label in SIZES else int(label)
+
+
+def _combos(rng, n_combos=2000):
+    k = rng.integers(1, 4, n_combos)
+    return np.array([" + ".join(rng.choice(MENU, size=i, replace=False)) for i in k], dtype=object)
+
+
+def sales_chunk(rng, start, n, n_clients, combos):
+    # Poucos clientes concentram muitos pedidos (Zipf), como numa base real
+    cli = np.minimum(rng.zipf(1.3, n), n_clients) - 1
+    return pd.DataFrame({
+        'id_pedido': np.arange(start + 1, start + n + 1),
+        'itens': combos[rng.integers(0, len(combos), n)],
+        'valor_total': np.round(rng.uniform(15, 150, n), 2),
+        'cliente': np.char.add("Cliente ", cli.astype(str)),
+    })
+
+
+def support_chunk(rng, start, n):
+    msgs = np.array(TICKETS, dtype=object)[rng.integers(0, len(TICKETS), n)]
+    # Sufixo com o nº do pedido: quase-duplicatas, como na fila real
+    suffix = np.char.add(" Pedido #", rng.integers(1000, 99999, n).astype(str)).astype(object)
+    return pd.DataFrame({'id_ticket': np.arange(start + 1, start + n + 1), 'mensagem_cliente': msgs + suffix})
+
+
+def write_csv(path, n, make_chunk):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    for start in range(0, n, CHUNK):
+        make_chunk(start, min(CHUNK, n - start)).to_csv(path, mode="w" if start == 0 else "a",
+                                                         header=start == 0, index=False, float_format="%.2f")
+    return path
+
+
+def generate(n, out_dir=DATA_DIR, seed=42, force=False):
+    """(caminho vendas, caminho suporte) com `n` linhas cada; reaproveita arquivos já gerados."""
+    rng = np.random.default_rng(seed)
+    sales = os.path.join(out_dir, f"vendas_{n}.csv")
+    support = os.path.join(out_dir, f"suporte_{n}.csv")
+    if force or not os.path.exists(sales):
+        combos, n_clients = _combos(rng), max(10, n // 5)
+        write_csv(sales, n, lambda s, k: sales_chunk(rng, s, k, n_clients, combos))
+    if force or not os.path.exists(support):
+        write_csv(support, n, lambda s, k: support_chunk(rng, s, k))
+    return sales, support
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Gera CSVs sintéticos de vendas e suporte.")
+    ap.add_argument("--sizes", default="10k", help="lista: 10k,1m,10m ou número de linhas")
+    ap.add_argument("--out", default=DATA_DIR)
+    ap.add_argument("--force", action="store_true")
+    a = ap.parse_args()
+    for label in a.sizes.split(","):
+        print(generate(parse_size(label), a.out, force=a.force))
@@ -0,0 +1,4 @@
+"""
+Núcleo do iFood Genius: lógica de IA e dados desacoplada do Streamlit.
+O `streamlit_app.py` só orquestra a UI; tudo aqui roda headless (benchmarks, workers).
+"""
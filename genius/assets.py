@@ -0,0 +1,41 @@
+"""
+Assets estáticos do app (logo em data URI e favicon redondo).
+Montados uma vez por processo pelo app; o favicon também pode ser gerado no build:
+  python tools/make_round_icon.py assets/ifood_icon.jpg
+"""
+import base64
+import os
+
+ICON_SIZE = 256
+
+
+def data_uri(path):
+    """Imagem local como data URI (ou None se não existir/não der para ler)."""
+    try:
+        with open(path, "rb") as f: encoded = base64.b64encode(f.read()).decode("utf-8")
+    except OSError:
+        return None
+    mime = "image/jpeg" if path.lower().endswith(('.jpg', '.jpeg')) else "image/png"
+    return f"data:{mime};base64,{encoded}"
+
+
+def make_round_icon(src, out, size=ICON_SIZE):
+    """Recorta o centro de `src` em quadrado, redimensiona e aplica máscara circular (PNG com transparência)."""
+    from PIL import Image, ImageDraw  # só quando o favicon precisa ser gerado
+    img = Image.open(src).convert("RGBA")
+    side = min(img.size)
+    left, top = (img.width - side) // 2, (img.height - side) // 2
+    img = img.crop((left, top, left + side, top + side)).resize((size, size), Image.LANCZOS)
+    mask = Image.new("L", (size, size), 0)
+    ImageDraw.Draw(mask).ellipse((0, 0, size, size), fill=255)
+    img.putalpha(mask)
+    img.save(out, format="PNG")
+    return out
+
+
+def page_icon(round_icon, icon, fallback="🔴"):
+    """Favicon redondo (gerado a partir de `icon` se ainda não existir), o ícone original ou um emoji."""
+    if not os.path.exists(round_icon) and os.path.exists(icon):
+        try: make_round_icon(icon, round_icon)
+        except Exception: pass
+    return round_icon if os.path.exists(round_icon) else (icon if os.path.exists(icon) else fallback)
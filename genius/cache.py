@@ -0,0 +1,77 @@
+"""
+Cache persistente (SQLite) das respostas do modelo, endereçado por conteúdo:
+chave = sha256(modelo, prompt, safety settings, generation config).
+TTL por entrada, despejo LRU por número de entradas e contadores de hit/miss.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_PATH = ".cache/genius_llm.sqlite"
+
+
+def cache_key(model_name, prompt, safety=None, generation_config=None):
+    # Enums do SDK viram str; ordenar garante a mesma chave entre processos
+    safety_txt = repr(sorted((str(k), str(v)) for k, v in (safety or {}).items()))
+    config_txt = repr(sorted((generation_config or {}).items()))
+    raw = "\x1f".join((model_name or "", prompt, safety_txt, config_txt))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, path=DEFAULT_PATH, ttl=7 * 24 * 3600, max_entries=50_000):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._puts = 0
+        self._lock = threading.Lock()
+        if path != ":memory:": os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""CREATE TABLE IF NOT EXISTS responses (
+            key TEXT PRIMARY KEY, response TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_accessed ON responses(accessed)")
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT response, created FROM responses WHERE key=?", (key,)).fetchone()
+            if row and (not self.ttl or now - row[1] <= self.ttl):
+                self._db.execute("UPDATE responses SET accessed=? WHERE key=?", (now, key))
+                self.hits += 1
+                return row[0]
+            if row: self._db.execute("DELETE FROM responses WHERE key=?", (key,))
+            self.misses += 1
+            return None
+
+    def put(self, key, response):
+        now = time.time()
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)", (key, response, now, now))
+            self._puts += 1
+            # Despejo amortizado: só confere o tamanho a cada 100 escritas
+            if self._puts % 100 == 0: self._evict(now)
+
+    def _evict(self, now):
+        if self.ttl: self._db.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+        excess = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0] - self.max_entries
+        if excess > 0:
+            self._db.execute("""DELETE FROM responses WHERE key IN (
+                SELECT key FROM responses ORDER BY accessed LIMIT ?)""", (excess,))
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            size = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        total = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'entries': size,
+                'hit_rate': round(self.hits / total, 3) if total else 0.0}
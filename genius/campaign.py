@@ -0,0 +1,136 @@
+"""
+Campanha de CRM em massa: um push personalizado para cada `cliente` da base.
+- favoritos de toda a base vêm do índice de vendas (uma passada vetorizada)
+- clientes com o mesmo favorito são agrupados num único prompt (contexto compartilhado)
+- geração num pool de threads com limite de req/min
+- resultado gravado em CSV de forma incremental; rodar de novo retoma de onde parou
+
+Uso:  python -m genius.campaign --out data/campanha_push.csv --rpm 60 [--fake]
+"""
+import argparse
+import csv
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from genius.llm import generate, is_error, extract_json_array, RateLimiter
+from genius.metrics import current_tab
+from genius.sales_index import get_sales_index
+
+OUT_PATH = "data/campanha_push.csv"
+COLUMNS = ["cliente", "favorito", "push", "gerado_em"]
+
+PUSH_PROMPT = "Aja como iFood. Cliente: {cli}. Favorito: {fav}. Escreva 1 notificação push curta, urgente e irresistível com emoji. Texto puro apenas."
+
+GROUP_PROMPT = """Aja como iFood. Todos os clientes abaixo têm o mesmo prato favorito: {fav}.
+Escreva para CADA cliente 1 notificação push curta, urgente e irresistível com emoji, personalizada com o nome dele.
+Responda APENAS com um array JSON, um objeto por cliente: [{{"cliente": "<nome>", "push": "..."}}]
+CLIENTES: {clientes}"""
+
+JSON_CONFIG = {"response_mime_type": "application/json"}
+
+
+def done_customers(path):
+    """Clientes já gravados no CSV de saída (checkpoint para retomar a campanha)."""
+    if not os.path.exists(path): return set()
+    with open(path, newline="", encoding="utf-8") as f:
+        return {row["cliente"] for row in csv.DictReader(f)}
+
+
+def plan_groups(favs, group_size=25, skip=()):
+    """Lotes (favorito, [clientes]) de até `group_size`, pulando os clientes em `skip`."""
+    favs = favs[~favs['cliente'].isin(skip)]
+    groups = []
+    for fav, g in favs.groupby('favorito', sort=False):
+        clientes = g['cliente'].tolist()
+        groups += [(fav, clientes[i:i + group_size]) for i in range(0, len(clientes), group_size)]
+    return groups
+
+
+class CampaignRunner:
+    def __init__(self, model, safety=None, out_path=OUT_PATH, max_workers=8, rpm=60, group_size=25,
+                 timeout=60, cache=None, tab=None):
+        self.model = model
+        self.safety = safety
+        self.out_path = out_path
+        self.max_workers = max(1, max_workers)
+        self.limiter = RateLimiter(rpm)
+        self.group_size = max(1, group_size)
+        self.timeout = timeout
+        self.cache = cache
+        self.tab = tab or current_tab.get()  # threads do pool não herdam o contexto da aba
+
+    def _generate(self, prompt, **kw):
+        self.limiter.wait()
+        return generate(self.model, prompt, self.safety, self.timeout, cache=self.cache, tab=self.tab, **kw)
+
+    def run_group(self, fav, clientes):
+        """Pushes do grupo; quem faltar na resposta em lote cai para o prompt individual."""
+        pushes = {}
+        if len(clientes) > 1:
+            raw = self._generate(GROUP_PROMPT.format(fav=fav, clientes=json.dumps(clientes, ensure_ascii=False)),
+                                 generation_config=JSON_CONFIG)
+            if is_error(raw): return []
+            for it in extract_json_array(raw):
+                if isinstance(it, dict) and isinstance(it.get('push'), str) and it['push'].strip():
+                    pushes[str(it.get('cliente', '')).strip()] = it['push'].strip()
+        for cli in clientes:
+            if cli in pushes: continue
+            raw = self._generate(PUSH_PROMPT.format(cli=cli, fav=fav))
+            if not is_error(raw): pushes[cli] = raw
+        now = time.strftime("%Y-%m-%d %H:%M:%S")
+        return [{'cliente': c, 'favorito': fav, 'push': pushes[c], 'gerado_em': now} for c in clientes if c in pushes]
+
+    def run(self, favs=None):
+        """Gera o progresso (clientes gravados, total) a cada grupo concluído."""
+        if favs is None: favs = get_sales_index().favorites_frame()
+        skip = done_customers(self.out_path)
+        groups = plan_groups(favs, self.group_size, skip)
+        total = sum(len(c) for _, c in groups)
+        written = 0
+        os.makedirs(os.path.dirname(self.out_path) or ".", exist_ok=True)
+        new_file = not os.path.exists(self.out_path) or os.path.getsize(self.out_path) == 0
+        with open(self.out_path, "a", newline="", encoding="utf-8") as f, \
+                ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="campaign") as pool:
+            out = csv.DictWriter(f, fieldnames=COLUMNS)
+            if new_file: out.writeheader()
+            pending = iter(groups)
+            inflight = set()
+            def refill():
+                for fav, clientes in pending:
+                    inflight.add(pool.submit(self.run_group, fav, clientes))
+                    if len(inflight) >= self.max_workers * 2: break
+            refill()
+            while inflight:
+                done, _ = wait(inflight, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    inflight.discard(fut)
+                    rows = fut.result()
+                    out.writerows(rows)
+                    f.flush()  # cada grupo gravado é um checkpoint
+                    written += len(rows)
+                    yield {'written': written, 'total': total, 'skipped': len(skip)}
+                refill()
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Campanha de push personalizada para toda a base de clientes.")
+    ap.add_argument("--out", default=OUT_PATH)
+    ap.add_argument("--workers", type=int, default=8)
+    ap.add_argument("--rpm", type=int, default=60)
+    ap.add_argument("--group-size", type=int, default=25)
+    ap.add_argument("--fake", action="store_true", help="usa o FakeModel local (sem API)")
+    ap.add_argument("--key", default=os.environ.get("GEMINI_KEY", ""))
+    a = ap.parse_args()
+    if a.fake:
+        from genius.fake import FakeModel
+        model = FakeModel(latency=0.2)
+    else:
+        import google.generativeai as genai
+        genai.configure(api_key=a.key)
+        model = genai.GenerativeModel("gemini-1.5-flash")
+    t0 = time.perf_counter()
+    p = {'written': 0, 'total': 0, 'skipped': 0}
+    for p in CampaignRunner(model, out_path=a.out, max_workers=a.workers, rpm=a.rpm, group_size=a.group_size).run():
+        print(f"\r{p['written']}/{p['total']} pushes", end="", flush=True)
+    print(f"\n{p} em {time.perf_counter() - t0:.1f}s -> {a.out}")
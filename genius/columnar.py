@@ -0,0 +1,255 @@
+"""
+Backend colunar opcional (Parquet via pyarrow) para os CSVs append-only.
+O CSV continua sendo a fonte: cada trecho anexado vira uma partição Parquet nova em
+`.cache/columnar/<nome>/`, com `itens` já quebrado numa coluna de lista (`itens_lista`).
+A leitura é memory-mapped e só das colunas pedidas; num processo novo, nada do CSV é reparseado.
+Categóricas são gravadas com índice int32 fixo: o pandas escolhe int8/int16 conforme o nº de
+categorias de cada trecho, e partições com larguras diferentes não se juntam na leitura.
+
+Ative com  GENIUS_STORAGE=parquet  (sem pyarrow instalado, o app segue no backend CSV).
+Conversão avulsa:  python -m genius.columnar [--sales CSV] [--support CSV]
+"""
+import argparse
+import hashlib
+import io
+import json
+import os
+import shutil
+import threading
+import pandas as pd
+from genius.data import SALES_PATH, SUPPORT_PATH, SALES_DTYPES, SUPPORT_DTYPES, concat_frames
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:  # dependência opcional
+    pa = pc = pq = None
+
+STORE_DIR = ".cache/columnar"
+MANIFEST = "_manifest.json"  # prefixo '_' : ignorado pelo pyarrow ao ler o diretório
+ROWS_PER_PART = 1_000_000
+MAX_PARTS = 64  # acima disso as partições pequenas dos appends são compactadas
+HEAD_BYTES = 64 * 1024  # trecho inicial do CSV usado para detectar arquivo reescrito
+LIST_COLUMNS = {'itens': 'itens_lista'}
+FORMAT = 2  # sobe quando o layout das partições muda (espelhos antigos são refeitos)
+
+
+def available():
+    return pq is not None
+
+
+def split_items(col):
+    """Coluna `a + b + c` -> lista ['a', 'b', 'c'] (mesmo split/strip do índice de vendas)."""
+    col = pc.cast(col, pa.string())
+    parts = pc.split_pattern(col, "+")
+    return pa.ListArray.from_arrays(parts.offsets, pc.utf8_trim_whitespace(parts.flatten()), mask=parts.is_null())
+
+
+def _arrow_types(t):
+    # Listas ficam em memória Arrow (sem virar objetos Python por linha)
+    return pd.ArrowDtype(t) if pa.types.is_list(t) or pa.types.is_large_list(t) else None
+
+
+def _fixed_dictionaries(t):
+    dict_type = pa.dictionary(pa.int32(), pa.string())
+    for i, field in enumerate(t.schema):
+        if pa.types.is_dictionary(field.type): t = t.set_column(i, field.name, t.column(i).cast(dict_type))
+    return t
+
+
+def _complete_end(f, start, size):
+    """Posição logo após o último '\n' em [start, size) (ou `start`, se não há linha completa)."""
+    pos = size
+    while pos > start:
+        n = min(HEAD_BYTES, pos - start)
+        f.seek(pos - n)
+        i = f.read(n).rfind(b"\n")
+        if i >= 0: return pos - n + i + 1
+        pos -= n
+    return start
+
+
+class _Slice(io.RawIOBase):
+    """Leitura de um arquivo aberto só até `end` (o parser não vê a linha incompleta do fim)."""
+
+    def __init__(self, f, end):
+        self.f, self.end = f, end
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        n = min(len(b), self.end - self.f.tell())
+        return self.f.readinto(memoryview(b)[:n]) if n > 0 else 0
+
+
+class ParquetTable:
+    """Espelho colunar de um CSV append-only, com a mesma interface do `CsvTable`."""
+
+    columnar = True
+
+    def __init__(self, path, dtypes, store_dir=STORE_DIR):
+        if not available(): raise ImportError("pyarrow não instalado: pip install pyarrow")
+        self.path = path
+        self.dtypes = dtypes
+        stem = os.path.splitext(os.path.basename(path))[0]
+        self.dir = os.path.join(store_dir, f"{stem}-{hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:8]}")
+        self.version = 0
+        self.reloads = 0
+        self.frame = None  # frame completo da última chamada sem `columns`
+        self._frames = {}  # tupla de colunas -> frame; projeções cobertas por outro frame não são guardadas
+        self._sig = None
+        self._meta = None
+        self._lock = threading.Lock()
+
+    # --- manifesto -------------------------------------------------------------------------
+    def _manifest_path(self):
+        return os.path.join(self.dir, MANIFEST)
+
+    def _read_manifest(self):
+        try:
+            with open(self._manifest_path(), encoding="utf-8") as f: return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _write_manifest(self, meta):
+        tmp = self._manifest_path() + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f: json.dump(meta, f)
+        os.replace(tmp, self._manifest_path())
+
+    def _head_hash(self, n):
+        with open(self.path, "rb") as f: return hashlib.sha1(f.read(min(n, HEAD_BYTES))).hexdigest()
+
+    def _valid(self, meta, size):
+        return (meta is not None and meta.get('format') == FORMAT and meta['offset'] <= size and meta['head'] == self._head_hash(meta['offset'])
+                and all(os.path.exists(os.path.join(self.dir, p['file'])) for p in meta['parts']))
+
+    def _reset(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+        os.makedirs(self.dir, exist_ok=True)
+        return {'format': FORMAT, 'offset': 0, 'head': None, 'header': None, 'columns': [], 'parts': [], 'rows': 0}
+
+    # --- conversão ---------------------------------------------------------------------------
+    def _to_arrow(self, df):
+        t = _fixed_dictionaries(pa.Table.from_pandas(df, preserve_index=False))
+        for col, lst in LIST_COLUMNS.items():
+            if col in t.column_names: t = t.append_column(lst, split_items(t[col].combine_chunks()))
+        return t
+
+    def _ingest(self, meta, size):
+        """Converte as linhas completas de [offset, size) do CSV em partições novas; devolve os arquivos criados.
+        Linha final sem '\n' fica para depois, e o manifesto só avança se o trecho inteiro foi convertido."""
+        with open(self.path, "rb") as f:
+            end = _complete_end(f, meta['offset'], size)
+            if end == meta['offset']: return []
+            f.seek(meta['offset'])
+            header = f.readline().decode("utf-8-sig").strip() if meta['offset'] == 0 else meta['header']
+            names = pd.read_csv(io.StringIO(header), nrows=0).columns.tolist()
+            seq, parts = meta.get('seq', 0), []
+            if f.tell() < end:
+                src = io.BufferedReader(_Slice(f, end))
+                for chunk in pd.read_csv(src, names=names, header=None, dtype=self.dtypes, chunksize=ROWS_PER_PART):
+                    if chunk.empty: continue
+                    seq += 1
+                    name = f"part-{seq:06d}.parquet"
+                    pq.write_table(self._to_arrow(chunk), os.path.join(self.dir, name))
+                    parts.append({'file': name, 'rows': len(chunk)})
+        meta.update(header=header, columns=names, seq=seq, offset=end, head=self._head_hash(end))
+        meta['parts'] += parts
+        meta['rows'] += sum(p['rows'] for p in parts)
+        return [p['file'] for p in parts]
+
+    def compact(self):
+        """Reescreve todas as partições em blocos de `ROWS_PER_PART` linhas."""
+        with self._lock:
+            meta = self._meta or self._read_manifest()
+            if not meta or len(meta['parts']) <= 1: return
+            self._compact(meta)
+            self._frames, self.frame = {}, None
+            self.reloads += 1
+            self.version += 1
+
+    def _compact(self, meta):
+        t = self._read([p['file'] for p in meta['parts']], None, arrow=True)
+        old = [p['file'] for p in meta['parts']]
+        meta['parts'] = []
+        for i, start in enumerate(range(0, t.num_rows, ROWS_PER_PART)):
+            name = f"compact-{meta.get('generation', 0) + 1}-{i:06d}.parquet"
+            piece = t.slice(start, ROWS_PER_PART)
+            pq.write_table(piece, os.path.join(self.dir, name))
+            meta['parts'].append({'file': name, 'rows': piece.num_rows})
+        meta['generation'] = meta.get('generation', 0) + 1
+        self._write_manifest(meta)
+        for name in old: os.remove(os.path.join(self.dir, name))
+
+    # --- leitura -----------------------------------------------------------------------------
+    def _read(self, files, columns, arrow=False):
+        if columns is None and not arrow: columns = self._meta['columns']  # frame "completo" = colunas do CSV
+        t = pq.read_table([os.path.join(self.dir, f) for f in files], columns=columns, memory_map=True)
+        return t if arrow else t.to_pandas(types_mapper=_arrow_types)
+
+    def sync(self):
+        """Traz o espelho em dia com o CSV; devolve (mudou, partições novas ou None se recarregou tudo)."""
+        try: st = os.stat(self.path)
+        except FileNotFoundError:
+            self._sig, self._meta, self._frames, self.frame = None, None, {}, None
+            return False, None
+        sig = (st.st_mtime_ns, st.st_size)
+        if sig == self._sig: return False, []
+        meta = self._meta or self._read_manifest()
+        fresh = self._meta is None
+        if not self._valid(meta, st.st_size):
+            meta, fresh = self._reset(), True
+        new = self._ingest(meta, st.st_size) if st.st_size > meta['offset'] else []
+        if len(meta['parts']) > MAX_PARTS:
+            self._compact(meta)
+            fresh = True
+        self._write_manifest(meta)
+        self._meta, self._sig = meta, sig
+        if fresh:
+            self.reloads += 1
+            self.version += 1
+            return True, None
+        if new: self.version += 1
+        return bool(new), new
+
+    def load(self, columns=None):
+        """Frame atual (ou None) com só as `columns` pedidas; appends leem só as partições novas."""
+        with self._lock:
+            changed, new = self.sync()
+            if self._meta is None or not self._meta['parts']: return None
+            key = tuple(columns) if columns else None
+            if changed and new is None: self._frames = {}
+            elif changed:
+                self._frames = {k: concat_frames(df, self._read(new, list(k) if k else None))
+                                for k, df in self._frames.items()}
+            df = self._frames.get(key)
+            if df is None:
+                want = list(key) if key else self._meta['columns']
+                # Projeção de um frame já em memória (copy-on-write, sem copiar dados); só vai ao disco se nenhum cobre
+                sup = next((f for f in self._frames.values() if set(want) <= set(f.columns)), None)
+                if sup is not None:
+                    df = sup[want]
+                else:
+                    df = self._frames[key] = self._read([p['file'] for p in self._meta['parts']], want)
+                    self._frames = {k: f for k, f in self._frames.items() if k == key or not set(f.columns) <= set(want)}
+            if key is None: self.frame = df
+            return df
+
+
+def convert(path, dtypes, store_dir=STORE_DIR):
+    t = ParquetTable(path, dtypes, store_dir)
+    with t._lock: t.sync()
+    return t._meta
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Converte os CSVs do app para Parquet particionado.")
+    ap.add_argument("--sales", default=SALES_PATH)
+    ap.add_argument("--support", default=SUPPORT_PATH)
+    ap.add_argument("--out", default=STORE_DIR)
+    a = ap.parse_args()
+    for p, d in ((a.sales, SALES_DTYPES), (a.support, SUPPORT_DTYPES)):
+        m = convert(p, d, a.out)
+        print(f"{p}: {m['rows'] if m else 0} linhas em {len(m['parts']) if m else 0} partição(ões)")
@@ -0,0 +1,141 @@
+"""
+Camada de acesso aos CSVs com carga incremental.
+Cada arquivo é parseado uma única vez (dtypes explícitos, `cliente`/`itens` categóricos);
+depois só as linhas anexadas desde a última leitura são lidas (checagem por mtime + tamanho).
+Linha final ainda sem '\n' é deixada para a próxima leitura (o escritor pode estar no meio dela);
+o offset só avança depois que o trecho é parseado.
+Os frames ficam num registro do processo e são compartilhados entre sessões: trate-os como somente leitura.
+Com GENIUS_STORAGE=parquet (e pyarrow instalado) o registro usa o backend colunar de `genius.columnar`.
+"""
+import hashlib
+import io
+import logging
+import os
+import threading
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+SALES_PATH = 'data/vendas_restaurante.csv'
+SUPPORT_PATH = 'data/suporte_ifood_simulado.csv'
+
+SALES_DTYPES = {'id_pedido': 'int64', 'itens': 'category', 'valor_total': 'float64', 'cliente': 'category'}
+SUPPORT_DTYPES = {'id_ticket': 'int64', 'mensagem_cliente': 'string'}
+
+CHECK_BYTES = 64 * 1024  # começo e fim do trecho já lido, para detectar arquivo reescrito
+
+STORAGE = os.environ.get("GENIUS_STORAGE", "csv").lower()  # csv | parquet
+
+log = logging.getLogger(__name__)
+
+
+class CsvTable:
+    """Frame em memória de um CSV append-only."""
+
+    columnar = False
+
+    def __init__(self, path, dtypes):
+        self.path = path
+        self.dtypes = dtypes
+        self.frame = None
+        self.version = 0  # incrementa a cada mudança (chave para índices derivados)
+        self.reloads = 0  # incrementa a cada releitura completa (índices derivados precisam recomeçar)
+        self._sig = None  # (mtime_ns, size) da última leitura
+        self._offset = 0  # bytes já parseados
+        self._header = b""
+        self._fp = None  # impressão digital de [0, _offset)
+        self._lock = threading.Lock()
+
+    def _read(self, buf):
+        return pd.read_csv(buf, dtype=self.dtypes)
+
+    def _full_load(self, size):
+        with open(self.path, "rb") as f:
+            data = f.read(size)
+        end = data.rfind(b"\n") + 1  # só linhas completas
+        frame = self._read(io.BytesIO(data[:end])) if end else None  # sem cabeçalho completo ainda
+        self.frame, self._offset = frame, end
+        self._header = data.split(b"\n", 1)[0] + b"\n"
+        self._fp = self._fingerprint(end)
+        self.reloads += 1
+
+    def _append(self, size):
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            tail = f.read(size - self._offset)
+        end = tail.rfind(b"\n") + 1  # só linhas completas
+        if end == 0: return False
+        tail = tail[:end]
+        new = self._read(io.BytesIO(self._header + tail)) if tail.strip() else None
+        self._offset += end
+        self._fp = self._fingerprint(self._offset)
+        if new is None or new.empty: return False
+        self.frame = concat_frames(self.frame, new)
+        return True
+
+    def load(self, columns=None):
+        """Devolve o frame atual (ou None se o arquivo não existe), relendo só o que mudou.
+        `columns` é só uma dica de projeção: aqui o frame vem sempre completo."""
+        with self._lock:
+            try: st = os.stat(self.path)
+            except FileNotFoundError:
+                self.frame, self._sig = None, None
+                return None
+            sig = (st.st_mtime_ns, st.st_size)
+            if sig == self._sig: return self.frame
+            changed = True
+            if self.frame is None or st.st_size < self._offset or not self._same_prefix():
+                self._full_load(st.st_size)  # arquivo novo, truncado ou reescrito
+            else:
+                changed = self._append(st.st_size)
+            self._sig = sig
+            if changed: self.version += 1
+            return self.frame
+
+    def _fingerprint(self, end):
+        """Hash do começo e do fim de [0, end): pega reescritas que mantêm o cabeçalho e não encolhem o arquivo."""
+        with open(self.path, "rb") as f:
+            h = hashlib.sha1(f.read(min(end, CHECK_BYTES)))
+            if end > CHECK_BYTES:
+                f.seek(max(CHECK_BYTES, end - CHECK_BYTES))
+                h.update(f.read(end - f.tell()))
+        return h.hexdigest()
+
+    def _same_prefix(self):
+        return self._fingerprint(self._offset) == self._fp
+
+
+def concat_frames(a, b):
+    # Concat preservando categorias: une os dicionários em vez de cair para object
+    out = {}
+    for col in a.columns:
+        if isinstance(a[col].dtype, pd.CategoricalDtype) and col in b:
+            out[col] = union_categoricals([a[col], b[col].astype("category")], ignore_order=True)
+        else:
+            out[col] = pd.concat([a[col], b[col]], ignore_index=True)
+    return pd.DataFrame(out)
+
+
+_TABLES = {}
+_TABLES_LOCK = threading.Lock()
+
+
+def make_table(path, dtypes, storage=None):
+    if (storage or STORAGE) == "parquet":
+        from genius.columnar import ParquetTable, available
+        if available(): return ParquetTable(path, dtypes)
+        log.warning("GENIUS_STORAGE=parquet sem pyarrow instalado; usando o backend CSV")
+    return CsvTable(path, dtypes)
+
+
+def get_table(path, dtypes):
+    with _TABLES_LOCK:
+        if path not in _TABLES: _TABLES[path] = make_table(path, dtypes)
+        return _TABLES[path]
+
+
+def load_sales(path=SALES_PATH, columns=None):
+    return get_table(path, SALES_DTYPES).load(columns)
+
+
+def load_support(path=SUPPORT_PATH, columns=None):
+    return get_table(path, SUPPORT_DTYPES).load(columns)
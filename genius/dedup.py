@@ -0,0 +1,109 @@
+"""
+Deduplicação de tickets antes da triagem (MinHash + LSH, só NumPy).
+Cada mensagem vira um conjunto de shingles de caracteres (texto normalizado, números trocados
+por '0' para que "Pedido #123" e "Pedido #456" coincidam) e uma assinatura MinHash.
+Um ticket só é ligado a um representante se a similaridade estimada (Jaccard) passar de
+`threshold`: o representante vai para a IA e o veredito é replicado para o resto do grupo.
+"""
+import re
+import threading
+import zlib
+from collections import OrderedDict, defaultdict
+import numpy as np
+from genius.retrieval import normalize
+
+NUM_PERM = 64
+BANDS = 16  # 16 bandas x 4 linhas: par com Jaccard 0.8 vira candidato com prob. > 99.9%
+SHINGLE = 4
+PRIME = np.uint64(4294967311)  # primo > 2^32: (a*h + b) mod p cabe em uint64
+BLOCK = 256  # docs por passada vetorizada (memória ~ NUM_PERM x shingles do bloco)
+
+
+def canonical(text):
+    return re.sub(r"[\W_]+", " ", re.sub(r"\d+", "0", normalize(text))).strip()
+
+
+def shingles(t, k=SHINGLE):
+    """Hashes dos k-gramas de caracteres de um texto já canônico."""
+    if len(t) <= k: return {zlib.crc32(t.encode())}
+    return {zlib.crc32(t[i:i + k].encode()) for i in range(len(t) - k + 1)}
+
+
+class MinHasher:
+    def __init__(self, num_perm=NUM_PERM, seed=1):
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, 2 ** 32, num_perm, dtype=np.uint64)[:, None]
+        self.b = rng.integers(0, 2 ** 32, num_perm, dtype=np.uint64)[:, None]
+
+    def signatures(self, texts):
+        """Matriz (len(texts), num_perm) de assinaturas de textos canônicos, em blocos vetorizados."""
+        out = []
+        for i in range(0, len(texts), BLOCK):
+            sets = [np.fromiter(shingles(t), dtype=np.uint64) for t in texts[i:i + BLOCK]]
+            starts = np.cumsum([0] + [len(s) for s in sets[:-1]])
+            hv = (self.a * np.concatenate(sets)[None, :] + self.b) % PRIME
+            out.append(np.minimum.reduceat(hv, starts, axis=1).T)
+        return np.vstack(out) if out else np.empty((0, len(self.a)), dtype=np.uint64)
+
+
+class TicketDeduper:
+    """Índice LSH dos representantes já vistos; persiste entre lotes (ex.: no worker)."""
+
+    def __init__(self, threshold=0.8, max_reps=50_000, num_perm=NUM_PERM, bands=BANDS):
+        self.threshold = threshold
+        self.max_reps = max_reps
+        self.hasher = MinHasher(num_perm)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.reps = OrderedDict()  # id representante -> assinatura (FIFO para limitar memória)
+        self.buckets = defaultdict(set)  # (banda, hash da banda) -> ids de representantes
+        self.verdicts = {}  # id representante -> resultado da triagem
+        self._lock = threading.Lock()
+
+    def _keys(self, sig):
+        return [(b, sig[b * self.rows:(b + 1) * self.rows].tobytes()) for b in range(self.bands)]
+
+    def _add(self, rep, sig):
+        self.reps[rep] = sig
+        for k in self._keys(sig): self.buckets[k].add(rep)
+        if len(self.reps) > self.max_reps: self.forget(next(iter(self.reps)))
+
+    def forget(self, rep):
+        """Tira o representante do índice (ex.: a triagem dele falhou)."""
+        sig = self.reps.pop(rep, None)
+        self.verdicts.pop(rep, None)
+        if sig is None: return
+        for k in self._keys(sig):
+            self.buckets[k].discard(rep)
+            if not self.buckets[k]: del self.buckets[k]
+
+    def assign(self, tickets):
+        """[(id, msg)] -> [(id_representante ou None, similaridade)]; None = o ticket vira representante."""
+        if not tickets: return []
+        # Textos repetidos (o caso comum numa fila) são assinados uma vez só
+        canon = [canonical(m) for _, m in tickets]
+        uniq = list(dict.fromkeys(canon))
+        sigs = dict(zip(uniq, self.hasher.signatures(uniq)))
+        out, seen = [], {}  # texto canônico -> (representante, similaridade) já decidido nesta chamada
+        with self._lock:
+            for (t, _), c in zip(tickets, canon):
+                if c in seen and seen[c][0] in self.reps:
+                    out.append(seen[c])
+                    continue
+                sig = sigs[c]
+                cands = set().union(*(self.buckets.get(k, ()) for k in self._keys(sig)))
+                best, sim = None, 0.0
+                for r in cands:
+                    s = float(np.mean(self.reps[r] == sig))
+                    if s > sim: best, sim = r, s
+                if best is not None and sim >= self.threshold:
+                    out.append((best, sim))
+                else:
+                    self._add(t, sig)
+                    out.append((None, 1.0))
+                    best, sim = t, 1.0
+                seen[c] = (best, sim)
+        return out
+
+    def stats(self):
+        return {'representantes': len(self.reps), 'vereditos': len(self.verdicts)}
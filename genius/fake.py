@@ -0,0 +1,105 @@
+"""
+Stand-in local do `genai.GenerativeModel` para testes e benchmarks offline.
+Simula latência fixa, timeout por requisição e rate-limit (429) periódico.
+Com `stream=True`, `latency` vira o time-to-first-token e cada chunk custa `chunk_latency`.
+`fail_rate` injeta falhas 503 aleatórias (para exercitar o roteador / circuit breaker).
+"""
+import itertools
+import json
+import random
+import threading
+import time
+from google.api_core import exceptions as ga_exceptions
+
+
+class FakeUsage:
+    def __init__(self, prompt, text):
+        # Aproximação grosseira de tokens: uma palavra = um token
+        self.prompt_token_count = len(prompt.split())
+        self.candidates_token_count = len(text.split())
+
+
+class FakeResponse:
+    def __init__(self, text, usage_metadata=None):
+        self.text = text
+        self.usage_metadata = usage_metadata
+
+
+class FakeStreamResponse:
+    def __init__(self, text, chunk_latency=0.0, words_per_chunk=3, usage_metadata=None):
+        self.text = text
+        self.usage_metadata = usage_metadata
+        self.chunk_latency = chunk_latency
+        self.words_per_chunk = words_per_chunk
+
+    def __iter__(self):
+        words = self.text.split(" ")
+        for i in range(0, len(words), self.words_per_chunk):
+            if i: time.sleep(self.chunk_latency)
+            last = i + self.words_per_chunk >= len(words)
+            # Como no SDK, o usage_metadata completo vem no último chunk
+            yield FakeResponse(" ".join(words[i:i + self.words_per_chunk]) + ("" if last else " "),
+                               self.usage_metadata if last else None)
+
+
+def fake_tag(msg):
+    m = msg.lower()
+    if any(k in m for k in ("crua", "passou mal", "saúde", "agora")): return "URGENTE"
+    if any(k in m for k in ("frio", "atras", "cupom")): return "MEDIA"
+    return "BAIXA"
+
+
+ACAO = "Oferecer cupom de desculpas e acompanhar o pedido"
+RESPOSTA = "Sentimos muito! Já estamos resolvendo para você."
+
+
+def triage_responder(prompt):
+    # Prompt empacotado (JSON): responde um objeto por ticket do array após "TICKETS:"
+    if "TICKETS:" in prompt:
+        tickets = json.loads(prompt.rsplit("TICKETS:", 1)[1])
+        return json.dumps([{'id_ticket': t['id_ticket'], 'classificacao': fake_tag(t['mensagem']),
+                            'acao': ACAO, 'resposta': RESPOSTA} for t in tickets], ensure_ascii=False)
+    return f"{fake_tag(prompt)} | {ACAO} | {RESPOSTA}"
+
+
+def campaign_responder(prompt):
+    # Prompt de campanha agrupada: um push por cliente do array após "CLIENTES:"
+    fav = prompt.split("favorito:", 1)[1].split(".", 1)[0].strip() if "favorito:" in prompt else "seu prato"
+    clientes = json.loads(prompt.rsplit("CLIENTES:", 1)[1])
+    return json.dumps([{'cliente': c, 'push': f"{c.split()[0]}, seu {fav} está te esperando! 🍔 Peça agora com 20% OFF!"}
+                       for c in clientes], ensure_ascii=False)
+
+
+def default_responder(prompt):
+    return campaign_responder(prompt) if "CLIENTES:" in prompt else triage_responder(prompt)
+
+
+class FakeModel:
+    def __init__(self, latency=0.2, rate_limit_every=0, responder=default_responder, model_name="models/fake-flash",
+                 chunk_latency=0.05, fail_rate=0.0):
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.chunk_latency = chunk_latency
+        self.rate_limit_every = rate_limit_every
+        self.responder = responder
+        self.model_name = model_name
+        self._calls = itertools.count(1)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def generate_content(self, prompt, safety_settings=None, request_options=None, stream=False, **kwargs):
+        with self._lock:
+            n = next(self._calls)
+            self.calls = n
+        timeout = (request_options or {}).get("timeout")
+        if timeout and self.latency > timeout:
+            time.sleep(timeout)
+            raise ga_exceptions.DeadlineExceeded("fake timeout")
+        time.sleep(self.latency)
+        if self.rate_limit_every and n % self.rate_limit_every == 0:
+            raise ga_exceptions.ResourceExhausted("fake 429")
+        if self.fail_rate and random.random() < self.fail_rate:
+            raise ga_exceptions.ServiceUnavailable("fake 503")
+        text = self.responder(prompt)
+        usage = FakeUsage(prompt, text)
+        return FakeStreamResponse(text, self.chunk_latency, usage_metadata=usage) if stream else FakeResponse(text, usage)
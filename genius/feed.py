@@ -0,0 +1,72 @@
+"""
+Feed paginado da fila de suporte.
+Os templates dos cards são compilados uma vez por processo (`string.Template`, sem quebras de linha
+nem indentação que o Markdown confundiria com bloco de código), todo campo passa por `html.escape`
+e só a página visível vira HTML: o payload por rerun é limitado por `PAGE_SIZE`, não pelo tamanho da fila.
+"""
+import html
+import math
+from string import Template
+from genius.triage import urgency_of
+
+PAGE_SIZE = 20
+
+URGENCY_FILTERS = {"Todas": None, "Urgente": "URGENTE", "Média": "MEDIA", "Baixa": "BAIXA"}
+STATUS_FILTERS = {"Triados": "done", "Na fila": "pending", "Triando": "processing", "Sem triagem": "error", "Todos": None}
+STATUS_LABELS = {"pending": "NA FILA", "processing": "TRIANDO", "error": "SEM TRIAGEM"}
+
+
+def _compile(markup):
+    return Template("".join(line.strip() for line in markup.splitlines()))
+
+
+CARD = _compile("""
+    <div class="css-card" style="padding:20px; border-left: 5px solid $border; position:relative;">
+        <div style="display:flex; justify-content:space-between; align-items:flex-start; margin-bottom:10px;">
+            <span style="font-weight:800; color:#333; font-size:1rem;">Ticket #$id</span>
+            <span class="status-tag $cls">$tag</span>
+        </div>
+        <div style="font-style:italic; color:#555; margin-bottom:15px;">"$mensagem"</div>
+        <div style="margin-bottom:10px;">
+            <strong style="color:#EA1D2C; font-size:0.85rem;">🛡️ AÇÃO ANTI-CHURN:</strong>
+            <div style="font-size:0.9rem; color:#374151; margin-top:2px;">$acao</div>
+        </div>
+        <div style="background:#F0F9FF; padding:12px; border-radius:8px; border:1px solid #E0F2FE;">
+            <strong style="color:#0284C7; font-size:0.85rem;">💬 SUGESTÃO DE RESPOSTA:</strong>
+            <div style="font-size:0.9rem; color:#374151; margin-top:2px; font-style:italic;">"$resposta"</div>
+        </div>
+    </div>
+""")
+
+PENDING_CARD = _compile("""
+    <div class="css-card" style="padding:20px; border-left: 5px solid $border; position:relative; opacity:0.85;">
+        <div style="display:flex; justify-content:space-between; align-items:flex-start; margin-bottom:10px;">
+            <span style="font-weight:800; color:#333; font-size:1rem;">Ticket #$id</span>
+            <span>$urgency<span class="status-tag" style="background:#F3F4F6; color:#6B7280 !important;">$status</span></span>
+        </div>
+        <div style="font-style:italic; color:#555;">"$mensagem"</div>
+    </div>
+""")
+
+
+def ticket_card(r):
+    """HTML de um ticket: card completo se já triado, card resumido com o status caso contrário."""
+    esc = lambda k: html.escape(str(r.get(k) or ""))
+    urg = r.get('urgency')
+    if r.get('status', 'done') != 'done':
+        # Rótulo das regras locais já aparece antes da IA responder
+        badge = f'<span class="status-tag tag-{urg}" style="margin-right:6px;">{urg}</span>' if urg else ""
+        return PENDING_CARD.substitute(id=esc('id_ticket'), mensagem=esc('mensagem'), urgency=badge,
+                                       border="#EA1D2C" if urg == "URGENTE" else "#EEE",
+                                       status=STATUS_LABELS.get(r['status'], r['status'].upper()))
+    urg = urg or urgency_of(r.get('tag'))
+    return CARD.substitute(id=esc('id_ticket'), tag=esc('tag'), mensagem=esc('mensagem'), acao=esc('acao'),
+                           resposta=esc('resposta'), cls=f"tag-{urg}", border="#EA1D2C" if urg == "URGENTE" else "#EEE")
+
+
+def render_page(rows):
+    return "".join(ticket_card(r) for r in rows)
+
+
+def page_count(total, size=PAGE_SIZE):
+    return max(1, math.ceil(total / size))
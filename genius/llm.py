@@ -0,0 +1,159 @@
+"""
+Chamada resiliente ao modelo: timeout por requisição e retry com backoff em rate-limit.
+Funciona com o `genai.GenerativeModel` real ou com o `FakeModel` local.
+Com `cache` (ResponseCache), respostas repetidas voltam do disco sem chamar a API;
+`cache_if` filtra o que vale guardar (ex.: só JSON de lote que passou na validação).
+`generate_stream` entrega os chunks conforme chegam (stream=True do SDK) para a UI.
+Toda chamada é registrada em `genius.metrics.METRICS` (latência, TTFB, tokens, erro, aba).
+"""
+import json
+import logging
+import random
+import threading
+import time
+from google.api_core import exceptions as ga_exceptions
+from genius.cache import cache_key
+from genius.metrics import METRICS, current_tab, usage_tokens
+
+log = logging.getLogger(__name__)
+
+OFFLINE = "Offline."
+ERRO = "Erro na IA."
+OFFLINE_ERROR = "ModelOffline"  # classe de erro nas métricas quando não há modelo configurado
+
+# Erros transitórios da API que valem nova tentativa (429 / 503 / deadline)
+RATE_LIMIT_ERRORS = (ga_exceptions.ResourceExhausted, ga_exceptions.TooManyRequests,
+                     ga_exceptions.ServiceUnavailable, ga_exceptions.DeadlineExceeded)
+
+
+def is_error(text):
+    return text in (OFFLINE, ERRO)
+
+
+def backoff_delay(attempt, base=1.0, cap=30.0):
+    # Exponencial com jitter para não sincronizar os workers
+    return min(cap, base * 2 ** attempt) + random.uniform(0, base)
+
+
+def extract_json_array(raw):
+    """Primeiro array JSON da resposta (tolera cercas ```json e texto em volta); [] se inválido."""
+    txt = raw.strip()
+    start, end = txt.find('['), txt.rfind(']')
+    if start < 0 or end < start: return []
+    try: data = json.loads(txt[start:end + 1])
+    except ValueError: return []
+    return data if isinstance(data, list) else []
+
+
+class RateLimiter:
+    """Espaça as chamadas entre threads para no máximo `rpm` requisições por minuto."""
+
+    def __init__(self, rpm):
+        self.interval = 60.0 / rpm if rpm else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval: return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now: time.sleep(slot - now)
+
+
+def _request(model, prompt, safety, timeout, generation_config, cache):
+    """(chave de cache, kwargs do generate_content) comuns às variantes bloqueante e streaming."""
+    key = cache_key(getattr(model, "model_name", ""), prompt, safety, generation_config) if cache is not None else None
+    opts = {"request_options": {"timeout": timeout}} if timeout else {}
+    if generation_config: opts["generation_config"] = generation_config
+    return key, opts
+
+
+def generate(model, prompt, safety=None, timeout=None, retries=3, backoff=1.0, generation_config=None, cache=None,
+             tab=None, cache_if=None):
+    if not model:
+        METRICS.record(0.0, error=OFFLINE_ERROR, tab=tab)
+        return OFFLINE
+    t0 = time.perf_counter()
+    name = getattr(model, "model_name", "")
+    key, opts = _request(model, prompt, safety, timeout, generation_config, cache)
+    if key:
+        hit = cache.get(key)
+        # Entrada que não passa em `cache_if` (gravada antes do filtro existir) é ignorada
+        if hit is not None and (cache_if is None or cache_if(hit)):
+            METRICS.record(time.perf_counter() - t0, cache_hit=True, tab=tab, model=name)
+            return hit
+    error = None
+    for attempt in range(retries + 1):
+        try:
+            resp = model.generate_content(prompt, safety_settings=safety, **opts)
+            text = resp.text.strip()
+            wall = time.perf_counter() - t0
+            METRICS.record(wall, wall, *usage_tokens(resp), tab=tab, model=name)
+            # Erros nunca chegam aqui; texto vazio também não vale a pena guardar
+            if key and text and (cache_if is None or cache_if(text)): cache.put(key, text)
+            return text
+        except RATE_LIMIT_ERRORS as e:
+            error = type(e).__name__
+            if attempt == retries: break
+            time.sleep(backoff_delay(attempt, backoff))
+        except Exception as e:
+            error = type(e).__name__
+            log.warning("Falha na chamada à IA (%s): %s", error, e)
+            break
+    METRICS.record(time.perf_counter() - t0, error=error, tab=tab, model=name)
+    return ERRO
+
+
+def _chunk_text(chunk):
+    # Chunks bloqueados/vazios levantam ValueError no `.text` do SDK
+    try: return chunk.text
+    except ValueError: return ""
+
+
+def generate_stream(model, prompt, safety=None, timeout=None, retries=3, backoff=1.0, generation_config=None, cache=None,
+                    tab=None):
+    """Gera os pedaços de texto da resposta. Retry só antes do 1º chunk; erro no meio encerra o stream."""
+    if not model:
+        METRICS.record(0.0, error=OFFLINE_ERROR, tab=tab)
+        yield OFFLINE
+        return
+    t0 = time.perf_counter()
+    tab = tab or current_tab.get()  # o gerador pode ser consumido fora do contexto da aba
+    name = getattr(model, "model_name", "")
+    key, opts = _request(model, prompt, safety, timeout, generation_config, cache)
+    if key:
+        hit = cache.get(key)
+        if hit is not None:
+            METRICS.record(time.perf_counter() - t0, cache_hit=True, tab=tab, model=name)
+            yield hit
+            return
+    parts, ttfb, tokens, error = [], None, (0, 0), None
+    for attempt in range(retries + 1):
+        try:
+            for chunk in model.generate_content(prompt, safety_settings=safety, stream=True, **opts):
+                if ttfb is None: ttfb = time.perf_counter() - t0
+                tokens = usage_tokens(chunk) if getattr(chunk, "usage_metadata", None) else tokens
+                txt = _chunk_text(chunk)
+                if not txt: continue
+                if not parts: txt = txt.lstrip()
+                parts.append(txt)
+                yield txt
+            error = None
+            break
+        except RATE_LIMIT_ERRORS as e:
+            error = type(e).__name__
+            if parts or attempt == retries: break
+            time.sleep(backoff_delay(attempt, backoff))
+        except Exception as e:
+            error = type(e).__name__
+            log.warning("Falha no streaming da IA (%s): %s", error, e)
+            break
+    text = "".join(parts).strip()
+    METRICS.record(time.perf_counter() - t0, ttfb, *tokens, error=error or (None if text else "EmptyResponse"),
+                   tab=tab, model=name)
+    if not text:
+        yield ERRO
+    elif key and error is None:  # resposta cortada no meio não vai para o cache
+        cache.put(key, text)
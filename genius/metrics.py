@@ -0,0 +1,119 @@
+"""
+Instrumentação de todas as chamadas à IA: tempo total, time-to-first-byte, tokens
+(`usage_metadata`), cache hit, classe do erro e aba de origem (support/sales/crm/chat).
+Agrega por aba em memória e exporta no formato texto do Prometheus.
+"""
+import contextlib
+import contextvars
+import functools
+import threading
+import time
+from collections import defaultdict, deque
+
+current_tab = contextvars.ContextVar("genius_tab", default="other")
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+@contextlib.contextmanager
+def tab_context(tab):
+    token = current_tab.set(tab)
+    try: yield
+    finally: current_tab.reset(token)
+
+
+def track_tab(tab):
+    """Decorator: chamadas à IA feitas dentro da função são atribuídas a `tab`."""
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with tab_context(tab): return fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+
+def usage_tokens(resp):
+    """(prompt, output) tokens do `usage_metadata` da resposta, ou (0, 0) se ausente."""
+    um = getattr(resp, "usage_metadata", None)
+    if um is None: return 0, 0
+    return int(getattr(um, "prompt_token_count", 0) or 0), int(getattr(um, "candidates_token_count", 0) or 0)
+
+
+class _Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.sum = 0.0
+        self.n = 0
+
+    def observe(self, v):
+        i = next((i for i, b in enumerate(LATENCY_BUCKETS) if v <= b), len(LATENCY_BUCKETS))
+        self.counts[i] += 1
+        self.sum += v
+        self.n += 1
+
+
+class Metrics:
+    def __init__(self, recent=500):
+        self.recent = deque(maxlen=recent)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.recent.clear()
+            self.calls = defaultdict(int)  # (tab, outcome) -> n; outcome = ok | cache | error
+            self.errors = defaultdict(int)  # (tab, classe do erro) -> n
+            self.tokens = defaultdict(int)  # (tab, prompt|output) -> n
+            self.latency = defaultdict(_Histogram)  # tab -> wall time
+            self.ttfb = defaultdict(_Histogram)  # tab -> time-to-first-byte
+
+    def record(self, wall, ttfb=None, prompt_tokens=0, output_tokens=0, cache_hit=False, error=None, tab=None, model=""):
+        tab = tab or current_tab.get()
+        outcome = "error" if error else ("cache" if cache_hit else "ok")
+        with self._lock:
+            self.calls[(tab, outcome)] += 1
+            if error: self.errors[(tab, error)] += 1
+            self.tokens[(tab, "prompt")] += prompt_tokens
+            self.tokens[(tab, "output")] += output_tokens
+            self.latency[tab].observe(wall)
+            if ttfb is not None: self.ttfb[tab].observe(ttfb)
+            self.recent.append({'tab': tab, 'model': model, 'outcome': outcome, 'error': error or "",
+                                'wall_s': round(wall, 4), 'ttfb_s': round(ttfb, 4) if ttfb is not None else None,
+                                'prompt_tokens': prompt_tokens, 'output_tokens': output_tokens, 'at': time.time()})
+
+    def summary(self):
+        """Uma linha por aba: chamadas, hit rate, erros, latência média e tokens."""
+        with self._lock:
+            rows = []
+            for tab in sorted({t for t, _ in self.calls}):
+                n = {o: self.calls.get((tab, o), 0) for o in ("ok", "cache", "error")}
+                total = sum(n.values())
+                h, f = self.latency.get(tab, _Histogram()), self.ttfb.get(tab, _Histogram())
+                rows.append({'aba': tab, 'chamadas': total, 'cache_hits': n['cache'], 'erros': n['error'],
+                             'latencia_media_s': round(h.sum / h.n, 3) if h.n else None,
+                             'ttfb_medio_s': round(f.sum / f.n, 3) if f.n else None,
+                             'tokens_prompt': self.tokens.get((tab, "prompt"), 0), 'tokens_saida': self.tokens.get((tab, "output"), 0)})
+            return rows
+
+    def export_prometheus(self):
+        out = []
+        with self._lock:
+            out += ["# HELP genius_llm_calls_total Chamadas à IA por aba e resultado.", "# TYPE genius_llm_calls_total counter"]
+            out += [f'genius_llm_calls_total{{tab="{t}",outcome="{o}"}} {n}' for (t, o), n in sorted(self.calls.items())]
+            out += ["# HELP genius_llm_errors_total Erros da IA por aba e classe de exceção.", "# TYPE genius_llm_errors_total counter"]
+            out += [f'genius_llm_errors_total{{tab="{t}",error="{e}"}} {n}' for (t, e), n in sorted(self.errors.items())]
+            out += ["# HELP genius_llm_tokens_total Tokens (usage_metadata) por aba.", "# TYPE genius_llm_tokens_total counter"]
+            out += [f'genius_llm_tokens_total{{tab="{t}",kind="{k}"}} {n}' for (t, k), n in sorted(self.tokens.items())]
+            for name, hists, help_txt in (("genius_llm_latency_seconds", self.latency, "Tempo total da chamada."),
+                                          ("genius_llm_ttfb_seconds", self.ttfb, "Tempo até o primeiro byte/chunk.")):
+                out += [f"# HELP {name} {help_txt}", f"# TYPE {name} histogram"]
+                for tab, h in sorted(hists.items()):
+                    acc = 0
+                    for b, c in zip(LATENCY_BUCKETS + ("+Inf",), h.counts):
+                        acc += c
+                        out.append(f'{name}_bucket{{tab="{tab}",le="{b}"}} {acc}')
+                    out += [f'{name}_sum{{tab="{tab}"}} {h.sum:.6f}', f'{name}_count{{tab="{tab}"}} {h.n}']
+        return "\n".join(out) + "\n"
+
+
+METRICS = Metrics()
@@ -0,0 +1,271 @@
+"""
+Recuperação local para o Genius Assistant.
+1. Perguntas de total/ranking (faturamento, melhor cliente, produto campeão...) são respondidas
+   direto dos agregados do pandas, sem chamar a IA — só as globais: se a pergunta cita um cliente
+   ou item conhecido ("faturamento da Maria"), ela segue para o passo 2.
+2. O resto vai para a IA com só os top-k pedidos/tickets relevantes (BM25 local) como contexto.
+O índice é montado numa thread na subida do app (`warm_up`), e os textos de itens/clientes são
+tokenizados uma vez por categoria, não por pedido.
+"""
+import math
+import re
+import threading
+import unicodedata
+from itertools import chain
+import numpy as np
+import pandas as pd
+from genius.data import SALES_PATH, SUPPORT_PATH, SALES_DTYPES, SUPPORT_DTYPES, get_table
+from genius.sales_index import get_sales_index
+
+STOPWORDS = frozenset("""a o e de da do das dos em no na nos nas um uma uns umas para pra por com sem que qual quais
+quem quanto quantos quantas como onde quando meu minha meus minhas seu sua seus suas foi foram ser sao eh e
+ao aos as os se mais menos muito pelo pela ou isso esse essa este esta eu voce voces nao sim ja tem""".split())
+
+TOP_K = 8
+_COMBINING = re.compile("[\u0300-\u036f]")  # acentos que o NFKD separa das letras
+_WORD = re.compile(r"\w+")
+
+
+def normalize(text):
+    txt = str(text).lower()
+    return txt if txt.isascii() else _COMBINING.sub("", unicodedata.normalize("NFKD", txt))
+
+
+def tokenize(text):
+    return [t for t in _WORD.findall(normalize(text)) if t not in STOPWORDS]
+
+
+def tokenize_many(values):
+    """`tokenize` em lote, sem o filtro de stopwords (o `Bm25Index.add` filtra o lote inteiro de uma vez)."""
+    return [_WORD.findall(normalize(v)) for v in values]
+
+
+class Bm25Index:
+    """BM25 em memória com listas invertidas; `add` é incremental e vetorizado por lote."""
+
+    def __init__(self, k1=1.5, b=0.75):
+        self.k1, self.b = k1, b
+        self.docs = []
+        self._lengths = []
+        # Um bloco CSR por `add`: (termos -> linha, limites das linhas, doc ids, tfs), ordenado por termo
+        self._blocks = []
+        self._np = None  # cache numpy das listas (invalidado a cada add)
+
+    def __len__(self):
+        return len(self.docs)
+
+    def add(self, texts, tokens=None):
+        """Indexa `texts`; `tokens` (opcional) são as listas já tokenizadas, na mesma ordem (stopwords são removidas aqui)."""
+        texts = list(texts)
+        if not texts: return
+        toks = tokens if tokens is not None else tokenize_many(texts)
+        base, n = len(self.docs), len(texts)
+        self.docs.extend(texts)
+        self._np = None
+        flat = np.fromiter(chain.from_iterable(toks), dtype=object)
+        docs = np.repeat(np.arange(base, base + n), [len(t) for t in toks])
+        codes, vocab = pd.factorize(flat)
+        keep = ~np.isin(vocab, list(STOPWORDS))[codes]
+        codes, docs = codes[keep], docs[keep]
+        self._lengths.extend(np.bincount(docs - base, minlength=n).tolist())
+        if not len(codes): return
+        # (termo, doc) únicos com a contagem = tf, ordenados por termo: as postings de cada termo ficam contíguas
+        span = base + n
+        pairs, tf = np.unique(codes.astype(np.int64) * span + docs, return_counts=True)
+        term, doc = np.divmod(pairs, span)
+        present, starts = np.unique(term, return_index=True)
+        self._blocks.append((pd.Index(vocab[present]), np.r_[starts, len(term)], doc, tf))
+
+    def _postings(self, term):
+        ids, tfs = [], []
+        for terms, bounds, doc, tf in self._blocks:
+            i = terms.get_indexer([term])[0]
+            if i < 0: continue
+            ids.append(doc[bounds[i]:bounds[i + 1]])
+            tfs.append(tf[bounds[i]:bounds[i + 1]])
+        return (np.concatenate(ids), np.concatenate(tfs).astype(np.float64)) if ids else None
+
+    def _arrays(self):
+        if self._np is None:
+            lengths = np.asarray(self._lengths, dtype=np.float64)
+            self._np = (lengths, lengths.mean() if len(lengths) else 0.0, {})
+        return self._np
+
+    def search(self, query, k=TOP_K):
+        """Índices dos k documentos mais relevantes (score > 0), do melhor para o pior."""
+        n = len(self.docs)
+        if not n: return []
+        lengths, avg, postings_np = self._arrays()
+        scores = np.zeros(n)
+        for term in set(tokenize(query)):
+            if term not in postings_np: postings_np[term] = self._postings(term)
+            if postings_np[term] is None: continue
+            ids, tfs = postings_np[term]
+            idf = math.log(1 + (n - len(ids) + 0.5) / (len(ids) + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * lengths[ids] / (avg or 1.0))
+            scores[ids] += idf * tfs * (self.k1 + 1) / (tfs + norm)
+        k = min(k, n)
+        top = np.argpartition(-scores, k - 1)[:k]
+        return [int(i) for i in top[np.argsort(-scores[top], kind="stable")] if scores[i] > 0]
+
+
+def order_docs(df):
+    return ("Pedido " + df['id_pedido'].astype(str) + ": " + df['itens'].astype(str)
+            + " | R$ " + df['valor_total'].map("{:.2f}".format) + " | cliente " + df['cliente'].astype(str)).tolist()
+
+
+def ticket_docs(df):
+    return ("Ticket " + df['id_ticket'].astype(str) + ": " + df['mensagem_cliente'].astype(str)).tolist()
+
+
+def _tokens_by_value(col):
+    # Cada valor distinto é tokenizado uma vez (categorias de itens/clientes, mensagens repetidas)
+    codes, uniq = pd.factorize(col.astype(str))
+    toks = tokenize_many(uniq)
+    return [toks[c] for c in codes]
+
+
+def order_tokens(df):
+    """Mesmos tokens de `tokenize(order_docs(df))`, sem tokenizar pedido a pedido."""
+    ids = df['id_pedido'].astype(str).tolist()
+    vals = df['valor_total'].map("{:.2f}".format).str.split(".").tolist()
+    return [["pedido", i, *it, "r", *v, "cliente", *c]
+            for i, it, v, c in zip(ids, _tokens_by_value(df['itens']), vals, _tokens_by_value(df['cliente']))]
+
+
+def ticket_tokens(df):
+    return [["ticket", i, *m] for i, m in zip(df['id_ticket'].astype(str).tolist(), _tokens_by_value(df['mensagem_cliente']))]
+
+
+class DataRetriever:
+    """Mantém o BM25 em sincronia com os CSVs: indexa só as linhas anexadas."""
+
+    def __init__(self, sales_path=SALES_PATH, support_path=SUPPORT_PATH):
+        self.sources = [(get_table(sales_path, SALES_DTYPES), order_docs, order_tokens),
+                        (get_table(support_path, SUPPORT_DTYPES), ticket_docs, ticket_tokens)]
+        self._seen = {}  # path -> (reloads, linhas indexadas)
+        self.index = Bm25Index()
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        with self._lock:
+            frames = [(t, docs, toks, t.load()) for t, docs, toks in self.sources]
+            if any(df is not None and self._seen.get(t.path, (t.reloads, 0))[0] != t.reloads for t, _, _, df in frames):
+                self.index, self._seen = Bm25Index(), {}  # algum CSV foi reescrito: reindexa tudo
+            for t, docs, toks, df in frames:
+                if df is None: continue
+                rows = self._seen.get(t.path, (t.reloads, 0))[1]
+                if len(df) > rows:
+                    new = df.iloc[rows:]
+                    self.index.add(docs(new), toks(new))
+                self._seen[t.path] = (t.reloads, len(df))
+
+    def context(self, question, k=TOP_K):
+        self.refresh()
+        return "\n".join(self.index.docs[i] for i in self.index.search(question, k))
+
+
+def _top_n(q, default=1):
+    m = re.search(r"\btop\s*(\d+)", q)
+    return int(m.group(1)) if m else (5 if "ranking" in q else default)
+
+
+def _brl(v):
+    return f"R$ {v:.2f}"
+
+
+# Vocabulário das próprias perguntas de agregado: sozinhas, essas palavras nunca identificam um cliente/item
+DOMAIN_WORDS = frozenset("""cliente clientes produto produtos pedido pedidos item itens prato pratos total totais
+ticket medio media valor faturamento receita ranking top melhor melhores maior maiores principal principais
+vendido vendidos vendida vendidas campeao numero quantidade""".split())
+MAX_NAME_WORDS = 6
+
+_NAMES = {}  # caminho -> (versão da tabela, (palavras distintivas, nomes completos))
+_NAMES_LOCK = threading.Lock()
+
+
+def _known_names(table, df, sales_path):
+    with _NAMES_LOCK:
+        version, names = _NAMES.get(sales_path, (None, None))
+    if version == table.version: return names
+    idx = get_sales_index(sales_path)
+    raw = list(df['cliente'].astype('category').cat.categories) + list(idx.item_counts.index if idx else [])
+    full = {tuple(t[:MAX_NAME_WORDS]) for t in map(tokenize, raw) if t and not (len(t) == 1 and t[0] in DOMAIN_WORDS)}
+    # Palavra solta (primeiro nome, sobrenome, "hamburguer") só conta se não for número nem termo do domínio
+    words = {w for t in full for w in t if len(w) >= 3 and not w.isdigit() and w not in DOMAIN_WORDS}
+    names = (words, full)
+    with _NAMES_LOCK: _NAMES[sales_path] = (table.version, names)
+    return names
+
+
+def _names_entity(q, names):
+    """True se a pergunta cita um cliente/item: nome completo (ex.: "cliente 12") ou palavra distintiva dele."""
+    words, full = names
+    toks = tokenize(q)
+    if not words.isdisjoint(toks): return True
+    return any(tuple(toks[i:i + n]) in full for n in range(1, MAX_NAME_WORDS + 1) for i in range(len(toks) - n + 1))
+
+
+def answer_from_aggregates(question, sales_path=SALES_PATH):
+    """Resposta exata para perguntas de total/ranking, ou None se a pergunta não for desse tipo
+    (ou se for sobre um cliente/item específico: o agregado global estaria errado)."""
+    q = normalize(question)
+    table = get_table(sales_path, SALES_DTYPES)
+    df = table.load(['valor_total', 'cliente'])
+    if df is None or df.empty: return None
+    if _names_entity(q, _known_names(table, df, sales_path)): return None
+    if re.search(r"ticket medio|valor medio|media por pedido", q):
+        return f"🧾 Ticket médio: {_brl(df['valor_total'].mean())} em {len(df)} pedidos."
+    if re.search(r"quant[oa]s pedidos|numero de pedidos|total de pedidos", q):
+        return f"📦 Total de pedidos: {len(df)}."
+    if re.search(r"(melhor|maior|principa\w*|top\s*\d*)\s+clientes?|ranking de clientes|quem (mais )?compr", q):
+        g = df.groupby('cliente', observed=True)['valor_total'].agg(['sum', 'count']).sort_values('sum', ascending=False)
+        rows = [f"{c} ({_brl(r['sum'])} em {int(r['count'])} pedidos)" for c, r in g.head(_top_n(q)).iterrows()]
+        if len(rows) == 1: return f"🏆 Melhor cliente: {rows[0]}"
+        return "🏆 Ranking de clientes:\n" + "\n".join(f"{i}. {r}" for i, r in enumerate(rows, 1))
+    if re.search(r"(produto|item|prato)s?\s+mais\s+(vendid|pedid)|top\s*\d*\s+(produto|item|prato)|campea|mais vendid|ranking de (produtos|itens|pratos)", q):
+        counts = get_sales_index(sales_path).item_counts.head(_top_n(q))
+        if len(counts) == 1: return f"🍔 Produto mais vendido: {counts.index[0]} ({int(counts.iloc[0])} unidades)."
+        return "🍔 Ranking de produtos:\n" + "\n".join(f"{i}. {it} ({int(n)})" for i, (it, n) in enumerate(counts.items(), 1))
+    if re.search(r"faturament\w*|fatur\w+|receita|total vendido|quanto vend\w+", q):
+        return f"💰 Faturamento total: {_brl(df['valor_total'].sum())} em {len(df)} pedidos."
+    return None
+
+
+_RETRIEVER = None
+_RETRIEVER_LOCK = threading.Lock()
+
+
+def get_retriever():
+    global _RETRIEVER
+    with _RETRIEVER_LOCK:
+        if _RETRIEVER is None:
+            _RETRIEVER = DataRetriever()
+            # Carga inicial do índice fora da primeira pergunta; `context` espera pelo lock se ainda não acabou
+            threading.Thread(target=_RETRIEVER.refresh, name="retriever-warmup", daemon=True).start()
+        return _RETRIEVER
+
+
+def warm_up():
+    """Cria o retriever (e dispara a indexação em segundo plano) na subida do app."""
+    get_retriever()
+
+
+def chat_prompt(question, k=TOP_K):
+    return f"Dados: {get_retriever().context(question, k)}. Pergunta: {question}. Responda curto e com emojis."
+
+
+def answer(question, generate_fn, k=TOP_K):
+    """Agregado exato quando possível; senão IA com contexto recuperado (top-k)."""
+    resp = answer_from_aggregates(question)
+    if resp is not None: return resp
+    return generate_fn(chat_prompt(question, k))
+
+
+def answer_stream(question, stream_fn, k=TOP_K):
+    """Mesmo roteamento de `answer`, mas gera os chunks da IA conforme chegam."""
+    resp = answer_from_aggregates(question)
+    if resp is not None:
+        yield resp
+        return
+    yield from stream_fn(chat_prompt(question, k))
@@ -0,0 +1,218 @@
+"""
+Roteador de modelos: escolhe por requisição entre os modelos Flash (rápidos/baratos) e Pro.
+- mantém p50/p95 de latência e taxa de erro numa janela móvel por modelo
+- prompts curtos/simples (classificação, push) -> Flash mais rápido e saudável
+- dentro do tier: medidos e saudáveis primeiro (por p50), depois os sem dados, por último os com
+  taxa de erro acima de `max_error_rate` (do menos para o mais falho)
+- prompts longos ou complexos -> Pro
+- circuit breaker: modelo que falha em sequência sai da rota até o cooldown passar
+A descoberta de modelos (`genai.list_models`) fica em cache no disco para não pesar no cold start.
+Expõe a mesma interface do `GenerativeModel` (`generate_content`, `model_name`).
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+
+log = logging.getLogger(__name__)
+
+DISCOVERY_CACHE = ".cache/models.json"
+DISCOVERY_TTL = 24 * 3600
+FALLBACK_MODELS = ["gemini-1.5-flash", "gemini-1.5-pro"]
+MODELS_PER_TIER = 2
+
+LONG_PROMPT_CHARS = 4000
+COMPLEX_HINTS = re.compile(r"estrat[eé]gi|explique|por que|compare|plano de|passo a passo", re.I)
+
+
+class ModelStats:
+    def __init__(self, window=100, failure_threshold=5, cooldown=30.0):
+        self.samples = deque(maxlen=window)  # (latência, ok)
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def record(self, latency, ok):
+        with self._lock:
+            self.samples.append((latency, ok))
+            self._probing = False
+            if ok:
+                self.consecutive_failures = 0
+                self.open_until = 0.0
+            else:
+                self.consecutive_failures += 1
+                if self.consecutive_failures >= self.failure_threshold:
+                    self.open_until = time.monotonic() + self.cooldown
+
+    def available(self):
+        """Circuito fechado, ou meio-aberto após o cooldown (libera uma única requisição de teste)."""
+        with self._lock:
+            if not self.open_until: return True
+            if time.monotonic() < self.open_until or self._probing: return False
+            self._probing = True
+            return True
+
+    def error_rate(self):
+        samples = list(self.samples)
+        return sum(not ok for _, ok in samples) / len(samples) if samples else 0.0
+
+    def percentile(self, q):
+        lat = sorted(l for l, ok in list(self.samples) if ok)
+        if not lat: return None
+        return lat[min(len(lat) - 1, int(q * len(lat)))]
+
+    def snapshot(self):
+        return {'calls': len(self.samples), 'p50': self.percentile(0.5), 'p95': self.percentile(0.95),
+                'error_rate': round(self.error_rate(), 3),
+                'circuit': "open" if self.open_until and time.monotonic() < self.open_until else "closed"}
+
+
+def is_pro(name):
+    return "pro" in name.lower()
+
+
+def is_complex(prompt):
+    return len(prompt) > LONG_PROMPT_CHARS or bool(COMPLEX_HINTS.search(prompt))
+
+
+class _TimedStream:
+    """Itera o stream do modelo registrando latência total e erros no fim."""
+
+    def __init__(self, inner, stats, t0):
+        self.inner, self.stats, self.t0 = inner, stats, t0
+
+    def __iter__(self):
+        try:
+            yield from self.inner
+        except Exception:
+            self.stats.record(time.perf_counter() - self.t0, False)
+            raise
+        self.stats.record(time.perf_counter() - self.t0, True)
+
+
+class ModelRouter:
+    model_name = "router"  # chave de cache: respostas de qualquer modelo roteado são intercambiáveis
+
+    def __init__(self, names, factory, max_error_rate=0.2, min_samples=5, **stats_kw):
+        self.names = list(names)
+        self.factory = factory
+        self.max_error_rate = max_error_rate
+        self.min_samples = min_samples  # abaixo disso a taxa de erro ainda não condena o modelo
+        self.stats = {n: ModelStats(**stats_kw) for n in self.names}
+        self._models = {}
+        self._lock = threading.Lock()
+
+    def _model(self, name):
+        with self._lock:
+            if name not in self._models: self._models[name] = self.factory(name)
+            return self._models[name]
+
+    def candidates(self, prompt):
+        """Modelos em ordem de preferência para este prompt (tier certo primeiro, mais rápido primeiro)."""
+        want_pro = is_complex(prompt)
+        def key(n):
+            s = self.stats[n]
+            p50, err = s.percentile(0.5), s.error_rate()
+            if len(s.samples) >= self.min_samples and err > self.max_error_rate: return (is_pro(n) != want_pro, 2, err)
+            if p50 is None: return (is_pro(n) != want_pro, 1, 0.0)
+            return (is_pro(n) != want_pro, 0, p50)
+        return sorted(self.names, key=key)
+
+    def pick(self, prompt):
+        ordered = self.candidates(prompt)
+        for n in ordered:
+            if self.stats[n].available(): return n
+        return ordered[0]  # todos com circuito aberto: tenta o preferido mesmo assim
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        name = self.pick(prompt)
+        stats = self.stats[name]
+        t0 = time.perf_counter()
+        try:
+            resp = self._model(name).generate_content(prompt, stream=stream, **kwargs)
+        except Exception:
+            stats.record(time.perf_counter() - t0, False)
+            raise
+        if stream: return _TimedStream(resp, stats, t0)
+        stats.record(time.perf_counter() - t0, True)
+        return resp
+
+    def health(self):
+        return {n: s.snapshot() for n, s in self.stats.items()}
+
+
+class LazyModel:
+    """Modelo montado numa thread (import do SDK + descoberta), fora do caminho da primeira pintura.
+    As chamadas esperam o carregamento terminar; falha no carregamento vira erro na chamada."""
+    model_name = "router"
+
+    def __init__(self, loader, timeout=60):
+        self.timeout = timeout
+        self.error = None
+        self._model = None
+        self._ready = threading.Event()
+        threading.Thread(target=self._load, args=(loader,), name="model-loader", daemon=True).start()
+
+    def _load(self, loader):
+        try: self._model = loader()
+        except Exception as e:
+            self.error = e
+            log.exception("Falha ao carregar o modelo")
+        finally: self._ready.set()
+
+    @property
+    def ready(self):
+        return self._ready.is_set()
+
+    def get(self):
+        if not self._ready.wait(self.timeout): raise TimeoutError("modelo ainda carregando")
+        if self._model is None: raise RuntimeError("modelo indisponível") from self.error
+        return self._model
+
+    def generate_content(self, prompt, **kwargs):
+        return self.get().generate_content(prompt, **kwargs)
+
+    def health(self):
+        return self._model.health() if self._model is not None and hasattr(self._model, "health") else {}
+
+
+def _discovery_key(api_key):
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+
+def discover_models(api_key, list_models, path=DISCOVERY_CACHE, ttl=DISCOVERY_TTL):
+    """Nomes dos modelos Flash/Pro com generateContent; usa o cache do disco enquanto válido."""
+    key = _discovery_key(api_key)
+    try:
+        with open(path, encoding="utf-8") as f:
+            cached = json.load(f).get(key)
+        if cached and time.time() - cached['at'] < ttl: return cached['models']
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    try:
+        names = [m.name for m in list_models()
+                 if "generateContent" in (getattr(m, "supported_generation_methods", None) or ["generateContent"])
+                 and ("flash" in m.name.lower() or is_pro(m.name))]
+    except Exception:
+        return FALLBACK_MODELS
+    # Poucos por tier: o roteador experimenta cada candidato antes de ter estatística
+    flash = [n for n in names if not is_pro(n)][:MODELS_PER_TIER]
+    pro = [n for n in names if is_pro(n)][:MODELS_PER_TIER]
+    names = flash + pro or FALLBACK_MODELS
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        data = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f: data = json.load(f)
+        data[key] = {'at': time.time(), 'models': names}
+        with open(path, "w", encoding="utf-8") as f: json.dump(data, f)
+    except (OSError, ValueError):
+        pass
+    return names
@@ -0,0 +1,55 @@
+"""
+Classificador local de urgência (URGENTE/MEDIA/BAIXA) por palavras-chave.
+Um regex por sinal, sobre o texto normalizado (minúsculo, sem acento): roda em microssegundos
+e rotula na chegada os tickets óbvios ("crua", "passou mal", "elogio"...). Sinais de saúde e
+segurança vencem sempre; sinais conflitantes ou ausentes = ambíguo (None), e a IA decide.
+Sinais fracos (peso < 1: "obrigado", "otimo") aparecem no fim de reclamações também; sozinhos
+ficam abaixo de `MIN_CONFIDENCE` e o ticket vai para a IA.
+"""
+import re
+from genius.retrieval import normalize
+
+MIN_CONFIDENCE = 0.8
+
+# (classe, regex, peso)
+SIGNALS = [
+    ("URGENTE", r"\bcru[ao]s?\b|mal passad[ao]", 2),
+    ("URGENTE", r"passou mal|passei mal|passaram mal|vomit\w*|hospital|intoxica\w*|alergi\w*|risco de saude", 2),
+    ("URGENTE", r"barata|inseto|cabelo|estragad\w*|podre|mofo", 2),
+    ("URGENTE", r"dinheiro de volta|estorno|reembols\w*|procon|processar", 1),
+    ("URGENTE", r"\burgente\b|absurdo|nunca mais", 1),
+    ("MEDIA", r"atras\w*|demor\w*", 1),
+    ("MEDIA", r"\bfri[oa]s?\b", 1),
+    # "quente" só é reclamação quando é a bebida/sobremesa ("lanche chegou quente" é elogio)
+    ("MEDIA", r"\b(refri\w*|bebida|suco|cerveja|sorvete|milk ?shake|acai|salada)\W+(\w+\W+){0,3}quente", 1),
+    ("MEDIA", r"faltando|faltou|veio sem|errad[oa]|trocad[oa]", 1),
+    ("MEDIA", r"revirad\w*|derramad\w*|amassad\w*|cobra\w*.*duas vezes|cobranca", 1),
+    ("BAIXA", r"elogi\w*|parabens|adorei|amei|excelente", 1),
+    ("BAIXA", r"otimo|obrigad\w*", 0.5),
+    ("BAIXA", r"cupom|duvida|onde (eu )?(insiro|coloco|encontro|acho)|como (eu )?(faco|uso)", 1),
+]
+_COMPILED = [(cls, re.compile(rx), w) for cls, rx, w in SIGNALS]
+
+
+def scores(msg):
+    txt = normalize(msg)
+    out = {}
+    for cls, rx, w in _COMPILED:
+        if rx.search(txt): out[cls] = out.get(cls, 0) + w
+    return out
+
+
+def classify(msg):
+    """(classe, confiança) pelas regras; classe None = ambíguo, vai para a IA."""
+    s = scores(msg)
+    if s.get("URGENTE", 0) >= 2: return "URGENTE", 0.95  # saúde/segurança: independe do resto
+    if s.get("URGENTE"): return "URGENTE", 0.85 if len(s) == 1 else 0.8  # reclamação forte + outros sinais
+    if len(s) == 1:
+        cls, n = next(iter(s.items()))
+        return cls, 0.9 if n > 1 else 0.85 if n == 1 else 0.6
+    return None, 0.0
+
+
+def label(msg, min_confidence=MIN_CONFIDENCE):
+    cls, conf = classify(msg)
+    return cls if conf >= min_confidence else None
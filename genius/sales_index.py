@@ -0,0 +1,126 @@
+"""
+Índice pré-computado de itens/clientes sobre o CSV de vendas.
+- `exploded`: tabela (pedido, cliente, item) — o split por '+' é feito uma vez por combo distinto
+- `item_counts`: frequência de cada item (campeão = `top_item`)
+- `customer_items`: contagem cliente x item (favorito = `favorite(cliente)`)
+Atualiza de forma incremental com as linhas anexadas; as consultas são O(1).
+No backend colunar o split já vem pronto (`itens_lista`) e só as colunas usadas são lidas.
+"""
+import threading
+import numpy as np
+import pandas as pd
+from genius.data import SALES_PATH, SALES_DTYPES, get_table
+
+
+INDEX_COLUMNS = ['id_pedido', 'cliente', 'itens']
+COLUMNAR_INDEX_COLUMNS = ['id_pedido', 'cliente', 'itens_lista']
+
+
+def _explode_lists(df):
+    # Coluna de lista do Parquet (pd.ArrowDtype): achatamento direto no Arrow
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    lists = pa.array(df['itens_lista'])
+    if isinstance(lists, pa.ChunkedArray): lists = lists.combine_chunks()
+    rep = pc.list_parent_indices(lists).to_numpy()
+    enc = pc.dictionary_encode(pc.list_flatten(lists))
+    names, inv = np.unique(np.asarray(enc.dictionary.to_pylist() or [""], dtype=object), return_inverse=True)
+    item_codes = inv[enc.indices.to_numpy()]
+    return pd.DataFrame({
+        'id_pedido': df['id_pedido'].to_numpy()[rep],
+        'cliente': df['cliente'].to_numpy()[rep],
+        'item': pd.Categorical.from_codes(item_codes, categories=pd.Index(names.astype(str))),
+    })
+
+
+def explode_orders(df):
+    """(id_pedido, cliente, item) para cada item de cada pedido, sem `str.split` por linha."""
+    if 'itens_lista' in df: return _explode_lists(df)
+    itens = df['itens'] if isinstance(df['itens'].dtype, pd.CategoricalDtype) else df['itens'].astype('category')
+    parts = [[x.strip() for x in str(c).split('+')] for c in itens.cat.categories]
+    names, flat = np.unique(np.array([x for p in parts for x in p] or [""], dtype=object), return_inverse=True)
+    lens = np.array([len(p) for p in parts], dtype=np.int64)
+    starts = np.cumsum(lens) - lens
+    codes = itens.cat.codes.to_numpy()
+    rows = np.flatnonzero(codes >= 0)
+    n = lens[codes[rows]]
+    rep = np.repeat(rows, n)
+    # posição de cada item dentro do seu combo
+    pos = np.arange(len(rep)) - np.repeat(np.cumsum(n) - n, n)
+    item_codes = flat[np.repeat(starts[codes[rows]], n) + pos]
+    return pd.DataFrame({
+        'id_pedido': df['id_pedido'].to_numpy()[rep],
+        'cliente': df['cliente'].to_numpy()[rep],
+        'item': pd.Categorical.from_codes(item_codes, categories=pd.Index(names.astype(str))),
+    })
+
+
+class SalesIndex:
+    def __init__(self):
+        self.rows = 0
+        self.exploded = None
+        # n = ocorrências, first = posição da 1ª ocorrência (empate resolvido como no Counter.most_common)
+        self.item_stats = pd.DataFrame({'n': [], 'first': []}, dtype='int64')
+        self.customer_items = pd.DataFrame({'n': [], 'first': []}, dtype='int64',
+                                           index=pd.MultiIndex.from_tuples([], names=['cliente', 'item']))
+        self.item_counts = pd.Series(dtype='int64')
+        self.favorites = {}
+        self.top_item = None
+
+    @staticmethod
+    def _merge(old, new):
+        return pd.concat([old, new]).groupby(level=list(range(new.index.nlevels))).agg({'n': 'sum', 'first': 'min'})
+
+    def update(self, df):
+        """Indexa só as linhas de `df` além de `self.rows` (o frame é append-only)."""
+        new = df.iloc[self.rows:]
+        if new.empty: return
+        pairs = explode_orders(new)
+        base = 0 if self.exploded is None else len(self.exploded)
+        self.exploded = pairs if self.exploded is None else pd.concat([self.exploded, pairs], ignore_index=True)
+        self.rows = len(df)
+        pairs = pairs.assign(item=pairs['item'].astype(str), pos=np.arange(base, base + len(pairs)))
+
+        items = pairs.groupby('item').agg(n=('pos', 'size'), first=('pos', 'min'))
+        self.item_stats = self._merge(self.item_stats, items).sort_values(['n', 'first'], ascending=[False, True])
+        self.item_counts = self.item_stats['n']
+        self.top_item = self.item_counts.index[0] if len(self.item_counts) else None
+
+        cust = pairs.groupby(['cliente', 'item'], observed=True).agg(n=('pos', 'size'), first=('pos', 'min'))
+        self.customer_items = self._merge(self.customer_items, cust)
+        # Só os clientes afetados pelo lote novo têm o favorito recalculado
+        touched = cust.index.unique(level='cliente')
+        sub = self.customer_items[self.customer_items.index.get_level_values('cliente').isin(touched)]
+        fav = sub.reset_index().sort_values(['n', 'first'], ascending=[False, True]).drop_duplicates('cliente')
+        self.favorites.update(zip(fav['cliente'], fav['item']))
+
+    def favorite(self, cliente):
+        return self.favorites.get(cliente)
+
+    def favorites_frame(self):
+        """(cliente, favorito) de toda a base, agrupado por favorito."""
+        df = pd.DataFrame({'cliente': list(self.favorites.keys()), 'favorito': list(self.favorites.values())})
+        return df.sort_values(['favorito', 'cliente'], kind='stable', ignore_index=True)
+
+    def items_of(self, cliente):
+        """Contagem de itens do cliente, do mais pedido para o menos."""
+        if cliente not in self.favorites: return pd.Series(dtype='int64')
+        return self.customer_items.xs(cliente, level='cliente').sort_values(['n', 'first'], ascending=[False, True])['n']
+
+
+_INDEXES = {}
+_LOCK = threading.Lock()
+
+
+def get_sales_index(path=SALES_PATH):
+    """Índice sincronizado com o CSV: lê só o que foi anexado e indexa só as linhas novas."""
+    table = get_table(path, SALES_DTYPES)
+    with _LOCK:
+        df = table.load(COLUMNAR_INDEX_COLUMNS if table.columnar else INDEX_COLUMNS)
+        if df is None: return None
+        idx, reloads = _INDEXES.get(path, (None, None))
+        if idx is None or reloads != table.reloads or len(df) < idx.rows:
+            idx = SalesIndex()
+        idx.update(df)
+        _INDEXES[path] = (idx, table.reloads)
+        return idx
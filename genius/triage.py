@@ -0,0 +1,229 @@
+"""
+Engine de triagem em lote da fila de suporte.
+Pool de threads com limite de concorrência, timeout por ticket e retry com backoff;
+os resultados são entregues conforme cada ticket termina (streaming para a UI).
+
+Modo empacotado (batch_size > 1): N tickets por requisição, resposta em JSON validada
+por `validate_item`; só os tickets que falharam no parse voltam para a fila.
+
+Deduplicação (dedup_threshold): quase-duplicatas são agrupadas localmente (`genius.dedup`);
+só um representante por grupo vai para a IA e o veredito dele é replicado para os demais.
+
+Benchmark offline:  python -m genius.triage --n 1000 --workers 16 --latency 0.2 --batch 10
+"""
+import argparse
+import json
+import time
+from collections import deque, defaultdict
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from genius.llm import generate, is_error, extract_json_array
+from genius.metrics import current_tab
+from genius.dedup import TicketDeduper
+
+CLASSES = ("URGENTE", "MEDIA", "BAIXA")
+
+PROMPT = """Analise este ticket do iFood: '{msg}'.
+                1. Classifique: URGENTE, MEDIA ou BAIXA.
+                2. Dê uma ação prática curta para evitar o CHURN (perda do cliente).
+                3. Escreva uma resposta curta e empática para o cliente.
+                Responda estritamente no formato: CLASSIFICACAO | ACAO ANTI-CHURN | RESPOSTA AO CLIENTE"""
+
+BATCH_PROMPT = """Analise os tickets do iFood abaixo. Para CADA ticket:
+1. Classifique: URGENTE, MEDIA ou BAIXA.
+2. Dê uma ação prática curta para evitar o CHURN (perda do cliente).
+3. Escreva uma resposta curta e empática para o cliente.
+Responda APENAS com um array JSON, um objeto por ticket, no formato:
+[{{"id_ticket": <id>, "classificacao": "URGENTE|MEDIA|BAIXA", "acao": "...", "resposta": "..."}}]
+TICKETS: {tickets}"""
+
+JSON_CONFIG = {"response_mime_type": "application/json"}
+
+DEDUP_BLOCK = 1000  # tickets agrupados por vez (mantém o streaming com filas enormes)
+
+
+def build_prompt(msg):
+    return PROMPT.format(msg=msg)
+
+
+def parse_response(raw):
+    parts = raw.split('|')
+    if len(parts) >= 3:
+        return {'tag': parts[0].strip(), 'acao': parts[1].strip(), 'resposta': parts[2].strip()}
+    return {'tag': "ANÁLISE", 'acao': raw, 'resposta': "---"}
+
+
+def urgency_of(tag):
+    """Classe de urgência (CLASSES) de uma tag livre da IA; o que não for URGENTE/MEDIA conta como BAIXA."""
+    tag = str(tag or "").upper()
+    return "URGENTE" if "URGENTE" in tag else ("MEDIA" if "MEDIA" in tag or "MÉDIA" in tag else "BAIXA")
+
+
+def build_batch_prompt(batch):
+    tickets = [{'id_ticket': str(t), 'mensagem': m} for t, m in batch]
+    return BATCH_PROMPT.format(tickets=json.dumps(tickets, ensure_ascii=False))
+
+
+def validate_item(item):
+    # Schema de cada item: id_ticket (int|str), classificacao (CLASSES), acao e resposta (str não vazia)
+    return (isinstance(item, dict) and isinstance(item.get('id_ticket'), (int, str))
+            and str(item.get('classificacao', '')).strip().upper() in CLASSES
+            and all(isinstance(item.get(k), str) and item[k].strip() for k in ('acao', 'resposta')))
+
+
+def propagate(rep, id_ticket, msg, sim):
+    """Resultado de um ticket do grupo a partir do veredito do representante."""
+    return {**rep, 'id_ticket': id_ticket, 'mensagem': msg, 'elapsed': 0.0,
+            'dedup_of': rep['id_ticket'], 'similaridade': round(sim, 3)}
+
+
+def parse_batch_response(raw):
+    """Devolve {id_ticket (str): item} só com os itens válidos; o resto é descartado."""
+    return {str(it['id_ticket']).strip(): it for it in extract_json_array(raw) if validate_item(it)}
+
+
+class TriageEngine:
+    def __init__(self, model, safety=None, max_workers=8, timeout=30, retries=3, backoff=1.0,
+                 batch_size=1, max_requeue=2, cache=None, tab=None, dedup_threshold=None):
+        self.model = model
+        self.safety = safety
+        self.max_workers = max(1, max_workers)
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.batch_size = max(1, batch_size)
+        self.max_requeue = max_requeue
+        self.cache = cache
+        self.tab = tab or current_tab.get()  # threads do pool não herdam o contexto da aba
+        self.dedup = TicketDeduper(dedup_threshold) if dedup_threshold else None  # persiste entre chamadas de `run`
+
+    def _generate(self, prompt, **kw):
+        return generate(self.model, prompt, self.safety, self.timeout, self.retries, self.backoff, cache=self.cache, tab=self.tab, **kw)
+
+    def triage_one(self, id_ticket, msg):
+        t0 = time.perf_counter()
+        raw = self._generate(build_prompt(msg))
+        res = {'id_ticket': id_ticket, 'mensagem': msg, 'ok': not is_error(raw), 'raw': raw}
+        if res['ok']: res.update(parse_response(raw))
+        res['elapsed'] = time.perf_counter() - t0
+        return res
+
+    def triage_batch(self, batch):
+        """Uma requisição para o lote inteiro. Devolve (resultados, tickets que falharam no parse)."""
+        t0 = time.perf_counter()
+        # Só vai para o cache a resposta com todos os tickets válidos: um re-queue com o mesmo prompt
+        # precisa chamar o modelo de novo, não receber a mesma resposta ruim
+        raw = self._generate(build_batch_prompt(batch), generation_config=JSON_CONFIG,
+                             cache_if=lambda txt: len(parse_batch_response(txt)) == len(batch))
+        if is_error(raw):
+            dt = time.perf_counter() - t0
+            return [{'id_ticket': t, 'mensagem': m, 'ok': False, 'raw': raw, 'elapsed': dt} for t, m in batch], []
+        parsed = parse_batch_response(raw)
+        dt = time.perf_counter() - t0
+        done, failed = [], []
+        for t, m in batch:
+            it = parsed.get(str(t))
+            if it is None:
+                failed.append((t, m))
+                continue
+            done.append({'id_ticket': t, 'mensagem': m, 'ok': True, 'raw': json.dumps(it, ensure_ascii=False),
+                         'tag': it['classificacao'].strip().upper(), 'acao': it['acao'].strip(),
+                         'resposta': it['resposta'].strip(), 'elapsed': dt})
+        return done, failed
+
+    def _jobs(self, tickets, requeue):
+        """Monta o próximo job: reprocessamentos têm prioridade sobre tickets novos."""
+        pending = iter(tickets)
+        while True:
+            batch = []
+            while requeue and len(batch) < self.batch_size:
+                batch.append(requeue.popleft())
+            for t, m in pending:
+                batch.append((t, m, 0))
+                if len(batch) >= self.batch_size: break
+            # None = fila vazia por enquanto (pode voltar a encher com re-queue)
+            yield batch or None
+
+    def _run_job(self, batch, single=False):
+        if single:
+            t, m, _ = batch[0]
+            return [self.triage_one(t, m)], []
+        done, failed = self.triage_batch([(t, m) for t, m, _ in batch])
+        tries = {t: n for t, _, n in batch}
+        return done, [(t, m, tries[t] + 1) for t, m in failed]
+
+    def run(self, tickets):
+        """Gera um resultado por ticket na ordem de conclusão. `tickets`: iterável de (id_ticket, mensagem)."""
+        if self.dedup is None:
+            yield from self._run(tickets)
+            return
+        it = iter(tickets)
+        while block := list(islice(it, DEDUP_BLOCK)):
+            yield from self._run_dedup(block)
+
+    def _run_dedup(self, block):
+        reps, followers = [], defaultdict(list)
+        for (t, m), (rep, sim) in zip(block, self.dedup.assign(block)):
+            if rep is None: reps.append((t, m))
+            elif rep in self.dedup.verdicts: yield propagate(self.dedup.verdicts[rep], t, m, sim)
+            else: followers[rep].append((t, m, sim))
+        for r in self._run(reps):
+            yield r
+            group = followers.pop(r['id_ticket'], [])
+            if r['ok']:
+                self.dedup.verdicts[r['id_ticket']] = r
+                for t, m, sim in group: yield propagate(r, t, m, sim)
+            else:
+                # Representante falhou: sai do índice e o grupo é triado normalmente
+                self.dedup.forget(r['id_ticket'])
+                followers[None] += group
+        orphans = [(t, m) for g in followers.values() for t, m, _ in g]
+        if orphans: yield from self._run(orphans)
+
+    def _run(self, tickets):
+        requeue = deque()
+        jobs = self._jobs(tickets, requeue)
+        # Janela deslizante: nunca mais que 2x workers em voo, mesmo com milhões de tickets
+        window = self.max_workers * 2
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="triage") as pool:
+            inflight = set()
+            def refill():
+                while len(inflight) < window:
+                    batch = next(jobs)
+                    if batch is None: break
+                    inflight.add(pool.submit(self._run_job, batch, self.batch_size == 1))
+            refill()
+            while inflight:
+                done, _ = wait(inflight, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    inflight.discard(fut)
+                    results, failed = fut.result()
+                    yield from results
+                    for t, m, n in failed:
+                        # Estourou as tentativas em lote: cai para o prompt individual
+                        if n > self.max_requeue: inflight.add(pool.submit(self._run_job, [(t, m, n)], True))
+                        else: requeue.append((t, m, n))
+                refill()
+
+
+def benchmark(n=1000, workers=16, latency=0.2, rate_limit_every=0, batch_size=1, dedup_threshold=None):
+    from genius.fake import FakeModel
+    model = FakeModel(latency=latency, rate_limit_every=rate_limit_every)
+    engine = TriageEngine(model, max_workers=workers, backoff=0.05, batch_size=batch_size, dedup_threshold=dedup_threshold)
+    msgs = ["Meu lanche chegou frio.", "A carne veio crua!", "Onde coloco o cupom?", "Elogio ao entregador."]
+    t0 = time.perf_counter()
+    ok = sum(r['ok'] for r in engine.run((i, msgs[i % len(msgs)]) for i in range(n)))
+    dt = time.perf_counter() - t0
+    return {'tickets': n, 'ok': ok, 'calls': model.calls, 'seconds': round(dt, 3), 'tickets_per_s': round(n / dt, 1)}
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Benchmark offline da triagem com modelo fake.")
+    ap.add_argument("--n", type=int, default=1000)
+    ap.add_argument("--workers", type=int, default=16)
+    ap.add_argument("--latency", type=float, default=0.2)
+    ap.add_argument("--rate-limit-every", type=int, default=0)
+    ap.add_argument("--batch", type=int, default=1)
+    ap.add_argument("--dedup", type=float, default=None, help="limiar de similaridade para agrupar tickets (ex.: 0.8)")
+    a = ap.parse_args()
+    print(benchmark(a.n, a.workers, a.latency, a.rate_limit_every, a.batch, a.dedup))
@@ -0,0 +1,240 @@
+"""
+Worker de triagem em segundo plano, desacoplado dos reruns do Streamlit.
+Faz polling do CSV de suporte, enfileira `id_ticket`s novos numa fila SQLite e tria cada um
+exatamente uma vez (claim com lease: ticket preso por um worker que morreu volta para a fila).
+A UI só lê os resultados prontos do `TriageStore`, paginados e filtrados no próprio SQLite.
+Na chegada, as regras locais (`genius.rules`) já rotulam a urgência dos tickets óbvios: eles
+aparecem na fila com a classe antes da IA responder, e os URGENTES são triados primeiro.
+Falhas têm backoff exponencial por ticket (`not_before`) e, se um lote inteiro falha (API fora do ar),
+o worker para de drenar e espaça os ciclos; tickets em 'error' voltam para a fila após `retry_errors`.
+
+Como processo avulso:  python -m genius.worker [--fake]
+Dentro do app: uma thread daemon por processo (via `st.cache_resource`).
+"""
+import argparse
+import logging
+import os
+import sqlite3
+import threading
+import time
+from genius.data import SUPPORT_PATH, SUPPORT_DTYPES, get_table
+from genius.rules import label as rule_label
+from genius.triage import TriageEngine, urgency_of
+
+log = logging.getLogger(__name__)
+
+STORE_PATH = ".cache/triage.sqlite"
+STATUSES = ("pending", "processing", "done", "error")
+# Colunas adicionadas depois da primeira versão do banco (migradas em bancos antigos)
+COLUMNS = {"urgency": "TEXT", "urgency_src": "TEXT", "not_before": "REAL"}
+
+
+class TriageStore:
+    def __init__(self, path=STORE_PATH, max_attempts=3, lease=300, backoff=30, max_backoff=600, retry_errors=3600):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.lease = lease
+        self.backoff = backoff  # espera após a 1ª falha; dobra a cada nova falha, até `max_backoff`
+        self.max_backoff = max_backoff
+        self.retry_errors = retry_errors  # tickets em 'error' voltam para a fila depois disso (None = nunca)
+        self._lock = threading.Lock()
+        if path != ":memory:": os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""CREATE TABLE IF NOT EXISTS tickets (
+            id_ticket INTEGER PRIMARY KEY, mensagem TEXT NOT NULL, status TEXT NOT NULL DEFAULT 'pending',
+            tag TEXT, acao TEXT, resposta TEXT, attempts INTEGER NOT NULL DEFAULT 0,
+            claimed_at REAL, updated_at REAL, urgency TEXT, urgency_src TEXT, not_before REAL)""")
+        self._migrate()
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_status ON tickets(status, urgency, id_ticket)")
+
+    def _migrate(self):
+        cols = {r['name'] for r in self._db.execute("PRAGMA table_info(tickets)")}
+        for col, kind in COLUMNS.items():
+            if col not in cols: self._db.execute(f"ALTER TABLE tickets ADD COLUMN {col} {kind}")
+        if "urgency" in cols: return
+        # Bancos criados antes do filtro por urgência: preenche a partir da tag
+        self._db.execute("DROP INDEX IF EXISTS idx_status")
+        rows = self._db.execute("SELECT id_ticket, tag FROM tickets WHERE status='done'").fetchall()
+        self._db.executemany("UPDATE tickets SET urgency=?, urgency_src='ia' WHERE id_ticket=?",
+                             ((urgency_of(r['tag']), r['id_ticket']) for r in rows))
+
+    def enqueue(self, tickets):
+        """Insere (id_ticket, mensagem[, urgência das regras]) novos como pendentes; ids já conhecidos são ignorados."""
+        rows = ((int(t[0]), str(t[1]), t[2] if len(t) > 2 else None) for t in tickets)
+        with self._lock:
+            cur = self._db.executemany("""INSERT OR IGNORE INTO tickets (id_ticket, mensagem, urgency, urgency_src)
+                VALUES (?, ?, ?, CASE WHEN ?3 IS NULL THEN NULL ELSE 'regra' END)""", rows)
+            return cur.rowcount
+
+    def claim(self, limit):
+        """Reserva até `limit` tickets pendentes fora do backoff (ou com lease vencido) numa transação exclusiva."""
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                # URGENTE primeiro; sem rótulo (ambíguo) pode ser urgente, então vem antes de MEDIA/BAIXA
+                rows = self._db.execute("""SELECT id_ticket, mensagem FROM tickets
+                    WHERE (status='pending' AND COALESCE(not_before, 0) <= ?) OR (status='processing' AND claimed_at < ?)
+                    ORDER BY CASE urgency WHEN 'URGENTE' THEN 0 WHEN 'MEDIA' THEN 2 WHEN 'BAIXA' THEN 3 ELSE 1 END,
+                    id_ticket LIMIT ?""", (now, now - self.lease, limit)).fetchall()
+                self._db.executemany("UPDATE tickets SET status='processing', claimed_at=? WHERE id_ticket=?",
+                                     ((now, r['id_ticket']) for r in rows))
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return [(r['id_ticket'], r['mensagem']) for r in rows]
+
+    def save(self, r):
+        with self._lock:
+            # Rótulo das regras prevalece; a IA contribui com a ação e a resposta
+            self._db.execute("""UPDATE tickets SET status='done', acao=?, resposta=?, updated_at=?,
+                tag=CASE WHEN urgency_src='regra' THEN urgency ELSE ? END,
+                urgency=CASE WHEN urgency_src='regra' THEN urgency ELSE ? END,
+                urgency_src=COALESCE(urgency_src, 'ia') WHERE id_ticket=?""",
+                             (r['acao'], r['resposta'], time.time(), r['tag'], urgency_of(r['tag']), int(r['id_ticket'])))
+
+    def fail(self, id_ticket):
+        """Devolve o ticket para a fila com backoff exponencial; após `max_attempts` falhas ele fica como 'error'."""
+        now = time.time()
+        with self._lock:
+            self._db.execute("""UPDATE tickets SET attempts=attempts+1, updated_at=?,
+                not_before=? + MIN(? * (1 << attempts), ?),
+                status=CASE WHEN attempts+1 >= ? THEN 'error' ELSE 'pending' END WHERE id_ticket=?""",
+                             (now, now, self.backoff, self.max_backoff, self.max_attempts, int(id_ticket)))
+
+    def requeue_errors(self, older_than=0):
+        """Devolve para a fila (com tentativas zeradas) os tickets em 'error' há mais de `older_than` segundos."""
+        with self._lock:
+            cur = self._db.execute("""UPDATE tickets SET status='pending', attempts=0, not_before=NULL
+                WHERE status='error' AND updated_at <= ?""", (time.time() - older_than,))
+            return cur.rowcount
+
+    def counts(self):
+        with self._lock:
+            got = dict(self._db.execute("SELECT status, COUNT(*) FROM tickets GROUP BY status").fetchall())
+        return {s: got.get(s, 0) for s in STATUSES}
+
+    @staticmethod
+    def _where(status, urgency):
+        conds = [(c, v) for c, v in (("status=?", status), ("urgency=?", urgency)) if v]
+        return (" WHERE " + " AND ".join(c for c, _ in conds) if conds else ""), [v for _, v in conds]
+
+    def count(self, status=None, urgency=None):
+        where, args = self._where(status, urgency)
+        with self._lock:
+            return self._db.execute(f"SELECT COUNT(*) FROM tickets{where}", args).fetchone()[0]
+
+    def page(self, status=None, urgency=None, limit=20, offset=0):
+        """Uma página da fila (qualquer status), filtrada por status e classe de urgência."""
+        where, args = self._where(status, urgency)
+        with self._lock:
+            rows = self._db.execute(f"""SELECT id_ticket, mensagem, status, urgency, urgency_src, tag, acao, resposta FROM tickets{where}
+                ORDER BY id_ticket LIMIT ? OFFSET ?""", (*args, limit, offset)).fetchall()
+        return [dict(r) for r in rows]
+
+    def results(self, limit=50, offset=0):
+        """Tickets já triados, no mesmo formato dos resultados do `TriageEngine`."""
+        with self._lock:
+            rows = self._db.execute("""SELECT id_ticket, mensagem, tag, acao, resposta FROM tickets
+                WHERE status='done' ORDER BY id_ticket LIMIT ? OFFSET ?""", (limit, offset)).fetchall()
+        return [dict(r) for r in rows]
+
+
+class TriageWorker(threading.Thread):
+    def __init__(self, model, safety=None, store=None, support_path=SUPPORT_PATH, interval=5.0, claim_size=50,
+                 max_interval=300.0, **engine_kw):
+        super().__init__(name="triage-worker", daemon=True)
+        self.store = store or TriageStore()
+        self.table = get_table(support_path, SUPPORT_DTYPES)
+        self.engine = TriageEngine(model, safety, tab="support", **engine_kw)
+        self.interval = interval
+        self.claim_size = claim_size
+        self.max_interval = max_interval
+        self.outages = 0  # ciclos seguidos em que um lote inteiro falhou
+        self._seen = (None, 0)  # (reloads, linhas já enfileiradas) do CSV
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+
+    def enqueue_new(self):
+        df = self.table.load()
+        if df is None: return 0
+        reloads, rows = self._seen
+        if reloads != self.table.reloads: rows = 0  # CSV reescrito: reenfileira tudo (ids repetidos são ignorados)
+        new = df.iloc[rows:]
+        self._seen = (self.table.reloads, len(df))
+        if not len(new): return 0
+        msgs = new['mensagem_cliente'].tolist()
+        return self.store.enqueue(zip(new['id_ticket'], msgs, map(rule_label, msgs)))
+
+    def poll_once(self):
+        """Tria até a fila esvaziar (ou um lote inteiro falhar). Devolve quantos tickets foram processados."""
+        if self.store.retry_errors is not None: self.store.requeue_errors(self.store.retry_errors)
+        done = 0
+        while not self._stop.is_set():
+            self.enqueue_new()  # a cada lote: quem chega durante a drenagem (ex.: URGENTE) entra na frente
+            batch = self.store.claim(self.claim_size)
+            if not batch: break
+            ok = 0
+            for r in self.engine.run(batch):
+                if r['ok']:
+                    self.store.save(r)
+                    ok += 1
+                else:
+                    self.store.fail(r['id_ticket'])
+                done += 1
+            if not ok:
+                # Provável indisponibilidade da API: para de drenar e espera o próximo ciclo
+                self.outages += 1
+                log.warning("Lote de triagem inteiro falhou (%d ciclo(s) seguido(s)); pausando", self.outages)
+                return done
+        self.outages = 0
+        return done
+
+    def delay(self):
+        """Intervalo até o próximo ciclo: dobra a cada ciclo seguido com lote inteiro falho."""
+        return min(self.interval * 2 ** min(self.outages, 16), self.max_interval)
+
+    def run(self):
+        while not self._stop.is_set():
+            try: self.poll_once()
+            except Exception: log.exception("Falha no ciclo do worker de triagem")
+            self._wake.wait(self.delay())
+            self._wake.clear()
+
+    def wake(self):
+        """Antecipa o próximo ciclo (ex.: usuário pediu triagem agora)."""
+        self._wake.set()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Worker de triagem em segundo plano.")
+    ap.add_argument("--store", default=STORE_PATH)
+    ap.add_argument("--support", default=SUPPORT_PATH)
+    ap.add_argument("--interval", type=float, default=5.0)
+    ap.add_argument("--workers", type=int, default=8)
+    ap.add_argument("--batch", type=int, default=10)
+    ap.add_argument("--dedup", type=float, default=0.8, help="limiar para replicar o veredito entre quase-duplicatas (0 desliga)")
+    ap.add_argument("--fake", action="store_true", help="usa o FakeModel local (sem API)")
+    ap.add_argument("--key", default=os.environ.get("GEMINI_KEY", ""))
+    a = ap.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    if a.fake:
+        from genius.fake import FakeModel
+        model = FakeModel(latency=0.2)
+    else:
+        import google.generativeai as genai
+        from genius.router import ModelRouter, discover_models
+        genai.configure(api_key=a.key)
+        model = ModelRouter(discover_models(a.key, genai.list_models), genai.GenerativeModel)
+    w = TriageWorker(model, store=TriageStore(a.store), support_path=a.support, interval=a.interval,
+                     max_workers=a.workers, batch_size=a.batch, dedup_threshold=a.dedup or None)
+    log.info("Worker de triagem rodando (Ctrl+C para sair)")
+    try: w.run()
+    except KeyboardInterrupt: w.stop()
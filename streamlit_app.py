@@ -1,13 +1,16 @@
 ﻿import streamlit as st
-import pandas as pd
-import google.generativeai as genai
-from google.generativeai.types import HarmCategory, HarmBlockThreshold
-from collections import Counter
-import time
-import os
-import base64
 import streamlit.components.v1 as components
-from google.api_core import exceptions as ga_exceptions
+from genius.assets import data_uri, page_icon as build_page_icon
+from genius.llm import generate, generate_stream
+from genius.cache import ResponseCache
+from genius.data import load_sales, load_support
+from genius.sales_index import get_sales_index
+from genius.retrieval import answer_stream, warm_up as warm_up_retriever
+from genius.campaign import CampaignRunner, OUT_PATH as CAMPAIGN_OUT
+from genius.router import ModelRouter, LazyModel, discover_models
+from genius.metrics import METRICS, track_tab
+from genius.worker import TriageStore, TriageWorker
+from genius.feed import URGENCY_FILTERS, STATUS_FILTERS, PAGE_SIZE, render_page, page_count
 
 # ==============================================================================
 # 1. SETUP & INFRAESTRUTURA
@@ -21,37 +24,34 @@ LOCAL_HEADER_LOGO = "assets/ifood_Logo.png"
 ICON_PATH = "assets/ifood_icon.jpg"
 ROUND_ICON = "assets/ifood_icon_round.png"
 
-def load_local_image(path):
-    if os.path.exists(path):
-        try:
-            with open(path, "rb") as f:
-                encoded = base64.b64encode(f.read()).decode("utf-8")
-                mime = "image/jpeg" if path.lower().endswith(('.jpg', '.jpeg')) else "image/png"
-                return f"data:{mime};base64,{encoded}"
-        except: pass
-    return None
-
-local_logo_data = load_local_image(LOCAL_HEADER_LOGO)
-if local_logo_data: LOGO_URL = local_logo_data
-
-# Helper de Favicon
-if not os.path.exists(ROUND_ICON) and os.path.exists(ICON_PATH):
-    try:
-        from PIL import Image, ImageDraw
-        img = Image.open(ICON_PATH).convert("RGBA")
-        s = min(img.size)
-        img = img.crop(((img.width-s)//2, (img.height-s)//2, (img.width+s)//2, (img.height+s)//2)).resize((256, 256), Image.LANCZOS)
-        mask = Image.new("L", (256, 256), 0)
-        ImageDraw.Draw(mask).ellipse((0, 0, 256, 256), fill=255)
-        img.putalpha(mask)
-        img.save(ROUND_ICON, format="PNG")
-    except: pass
-
-page_icon = ROUND_ICON if os.path.exists(ROUND_ICON) else (ICON_PATH if os.path.exists(ICON_PATH) else "🔴")
+# Triagem em lote (concorrência limitada para respeitar a cota da API)
+TRIAGE_WORKERS = 8
+TRIAGE_TIMEOUT = 30
+TRIAGE_BATCH = 10  # tickets empacotados por requisição (resposta em JSON)
+TRIAGE_DEDUP = 0.8  # similaridade mínima para herdar o veredito de um ticket quase idêntico
+TRIAGE_STORE_PATH = ".cache/triage.sqlite"  # fila + resultados do worker em segundo plano
+TRIAGE_REFRESH_S = 5  # a aba de suporte relê os resultados prontos nesse intervalo
+SALES_PAGE = 500  # linhas por página na tabela de vendas
+
+# Campanha de CRM em massa (respeita a cota de req/min da API)
+CAMPAIGN_WORKERS = 8
+CAMPAIGN_RPM = 60
+
+# Cache de respostas da IA (sobrevive a reruns e restarts)
+LLM_CACHE_PATH = ".cache/genius_llm.sqlite"
+LLM_CACHE_TTL = 24 * 3600
+
+# Assets estáticos: lidos/gerados uma vez por processo, não a cada sessão ou rerun
+@st.cache_resource(show_spinner=False)
+def get_static_assets():
+    return data_uri(LOCAL_HEADER_LOGO) or LOGO_URL, build_page_icon(ROUND_ICON, ICON_PATH)
+
+LOGO_URL, page_icon = get_static_assets()
 
 st.set_page_config(page_title="iFood Partner Portal", page_icon=page_icon, layout="wide", initial_sidebar_state="collapsed")
 
 # --- CSS: VISUAL IFOOD + FIX MOBILE ---
+@st.cache_resource(show_spinner=False)
 def carregar_css():
     return f"""
     <style>
@@ -148,23 +148,59 @@ st.markdown(carregar_css(), unsafe_allow_html=True)
 # ==============================================================================
 # 2. IA CONFIG
 # ==============================================================================
-@st.cache_resource
+# Forma em texto aceita pelo SDK: não exige importar `google.generativeai.types` no startup
+SAFETY = {"HARM_CATEGORY_HARASSMENT": "BLOCK_NONE"}
+
+def _load_router(api_key):
+    import google.generativeai as genai  # import pesado (~0.6s): roda na thread do LazyModel
+    genai.configure(api_key=api_key)
+    # Roteador: Flash para prompts simples, Pro para os complexos, com circuit breaker por modelo
+    return ModelRouter(discover_models(api_key, genai.list_models), genai.GenerativeModel)
+
+@st.cache_resource(show_spinner=False)
 def get_model(api_key):
     if not api_key: return None, None
-    try:
-        genai.configure(api_key=api_key)
-        safety = {HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE}
-        for m in genai.list_models():
-            if 'flash' in m.name.lower(): return genai.GenerativeModel(m.name), safety
-        return genai.GenerativeModel('gemini-1.5-pro'), safety
-    except: return None, None
+    # SDK + descoberta de modelos em segundo plano: a primeira pintura não espera por eles
+    return LazyModel(lambda: _load_router(api_key)), SAFETY
 
 model, safety = get_model(DEFAULT_KEY)
 
+@st.cache_resource
+def get_llm_cache():
+    return ResponseCache(LLM_CACHE_PATH, ttl=LLM_CACHE_TTL)
+
+llm_cache = get_llm_cache()
+
+# Worker de triagem: uma thread daemon por processo, independente de reruns e de abas abertas
+@st.cache_resource
+def get_triage_store():
+    return TriageStore(TRIAGE_STORE_PATH)
+
+@st.cache_resource
+def get_triage_worker():
+    if not model: return None
+    w = TriageWorker(model, safety, get_triage_store(), max_workers=TRIAGE_WORKERS, timeout=TRIAGE_TIMEOUT,
+                     batch_size=TRIAGE_BATCH, cache=llm_cache, dedup_threshold=TRIAGE_DEDUP)
+    w.start()
+    return w
+
+triage_store = get_triage_store()
+triage_worker = get_triage_worker()
+warm_up_retriever()  # índice do chat montado numa thread na subida, não na primeira pergunta
+
 def _safe_generate(prompt):
-    if not model: return "Offline."
-    try: return model.generate_content(prompt, safety_settings=safety).text.strip()
-    except: return "Erro na IA."
+    return generate(model, prompt, safety, cache=llm_cache)
+
+def _safe_stream(prompt):
+    return generate_stream(model, prompt, safety, cache=llm_cache)
+
+def stream_into(placeholder, chunks, render):
+    # Redesenha o placeholder a cada chunk: a latência percebida passa a ser o time-to-first-token
+    text = ""
+    for chunk in chunks:
+        text += chunk
+        placeholder.markdown(render(text), unsafe_allow_html=True)
+    return text.strip()
 
 def render_phone(item, msg):
     return f"""
@@ -181,16 +217,31 @@ def render_phone(item, msg):
         </div>
     </div>"""
 
+def render_chat_bubble(msg):
+    align = "right" if msg['role'] == 'user' else "left"
+    bg = "#F3F4F6" if msg['role'] == 'user' else "#FFF0F0"
+    color = "#333" if msg['role'] == 'user' else "#EA1D2C"
+    return f"""<div style="text-align:{align}; margin-bottom:8px;"><span style="background:{bg}; color:{color}; padding:8px 14px; border-radius:12px; display:inline-block; font-size:0.9rem; font-weight:500; white-space:pre-line;">{msg['text']}</span></div>"""
+
+def pager(label, total, size, key):
+    """Seletor de página com o valor salvo ajustado quando o total (ou o filtro) encolhe."""
+    pages = page_count(total, size)
+    if st.session_state.get(key, 1) > pages: st.session_state[key] = pages
+    page = st.number_input(label, min_value=1, max_value=pages, step=1, key=key, help=f"{pages} página(s)")
+    return (page - 1) * size
+
 # ==============================================================================
 # 3. FRAGMENTOS
 # ==============================================================================
 
-@st.fragment
+@st.fragment(run_every=TRIAGE_REFRESH_S)
+@track_tab("support")
 def render_support_tab():
-    count = 0
-    if os.path.exists('data/suporte_ifood_simulado.csv'):
-        df = pd.read_csv('data/suporte_ifood_simulado.csv')
-        count = len(df)
+    # Só leitura: quem tria é o worker em segundo plano, então o custo aqui não depende do tamanho da fila
+    df = load_support()
+    total = len(df) if df is not None else 0
+    counts = triage_store.counts()
+    count = max(total - counts['done'], 0)
     
     st.write("")
     c1, c2 = st.columns([1, 2.5])
@@ -199,64 +250,40 @@ def render_support_tab():
             <div style="color:#666; font-weight:700; letter-spacing:1px;">FILA DE ATENDIMENTO</div>
             <div style="font-size:4rem; font-weight:900; color:#333; line-height:1.1;">{count}</div>
             <div style="color:#EA1D2C; font-weight:bold;">Tickets Pendentes</div></div>""", unsafe_allow_html=True)
-        if st.button("⚡ TRIAGEM AUTOMÁTICA"): st.session_state['processed'] = True
+        urgent = triage_store.count("pending", "URGENTE") + triage_store.count("processing", "URGENTE")
+        if urgent: st.error(f"🚨 {urgent} ticket(s) URGENTE(s) na fila — triados primeiro.")
+        if st.button("⚡ TRIAGEM AUTOMÁTICA"):
+            st.session_state['processed'] = True
+            if triage_worker: triage_worker.wake()
 
     with c2:
-        if st.session_state.get('processed') and count > 0:
+        if st.session_state.get('processed') and total > 0:
             st.markdown("##### 📋 Análise de Risco & Churn")
-            for i, row in df.head(3).iterrows():
-                msg = row['mensagem_cliente']
-                prompt = f"""Analise este ticket do iFood: '{msg}'. 
-                1. Classifique: URGENTE, MEDIA ou BAIXA.
-                2. Dê uma ação prática curta para evitar o CHURN (perda do cliente).
-                3. Escreva uma resposta curta e empática para o cliente.
-                Responda estritamente no formato: CLASSIFICACAO | ACAO ANTI-CHURN | RESPOSTA AO CLIENTE"""
-                
-                res_raw = _safe_generate(prompt)
-                
-                if "Offline" in res_raw or "Erro" in res_raw:
-                    st.warning("⚠️ IA Offline.")
-                    continue
-
-                parts = res_raw.split('|')
-                if len(parts) >= 3:
-                    tag_txt = parts[0].strip()
-                    churn_action = parts[1].strip()
-                    client_response = parts[2].strip()
-                else:
-                    tag_txt = "ANÁLISE"
-                    churn_action = res_raw
-                    client_response = "---"
-
-                cls = "tag-URGENTE" if "URGENTE" in tag_txt.upper() else ("tag-MEDIA" if "MEDIA" in tag_txt.upper() else "tag-BAIXA")
-                border_color = "#EA1D2C" if "URGENTE" in tag_txt.upper() else "#EEE"
-                
-                html_content = f"""
-                <div class="css-card" style="padding:20px; border-left: 5px solid {border_color}; position:relative;">
-                    <div style="display:flex; justify-content:space-between; align-items:flex-start; margin-bottom:10px;">
-                        <span style="font-weight:800; color:#333; font-size:1rem;">Ticket #{i+1}</span>
-                        <span class="status-tag {cls}">{tag_txt}</span>
-                    </div>
-                    <div style="font-style:italic; color:#555; margin-bottom:15px;">"{msg}"</div>
-                    <div style="margin-bottom:10px;">
-                        <strong style="color:#EA1D2C; font-size:0.85rem;">🛡️ AÇÃO ANTI-CHURN:</strong>
-                        <div style="font-size:0.9rem; color:#374151; margin-top:2px;">{churn_action}</div>
-                    </div>
-                    <div style="background:#F0F9FF; padding:12px; border-radius:8px; border:1px solid #E0F2FE;">
-                        <strong style="color:#0284C7; font-size:0.85rem;">💬 SUGESTÃO DE RESPOSTA:</strong>
-                        <div style="font-size:0.9rem; color:#374151; margin-top:2px; font-style:italic;">"{client_response}"</div>
-                    </div>
-                </div>
-                """
-                st.markdown(html_content, unsafe_allow_html=True)
+            if not triage_worker: st.warning("⚠️ IA Offline.")
+            elif count: st.progress(counts['done'] / total, text=f"Triados {counts['done']}/{total} (worker em segundo plano)")
+            if counts['error']:
+                st.warning(f"⚠️ {counts['error']} ticket(s) sem triagem após várias tentativas.")
+                if st.button("🔁 TENTAR DE NOVO", key="requeue_errors") and triage_store.requeue_errors():
+                    if triage_worker: triage_worker.wake()
+            # Filtro e paginação no SQLite: só a página visível sai do banco e vira HTML
+            f1, f2, f3 = st.columns(3)
+            urg = URGENCY_FILTERS[f1.selectbox("Urgência", list(URGENCY_FILTERS), key="feed_urgency")]
+            status = STATUS_FILTERS[f2.selectbox("Status", list(STATUS_FILTERS), key="feed_status")]
+            n = triage_store.count(status, urg)
+            with f3: offset = pager("Página", n, PAGE_SIZE, "feed_page")
+            rows = triage_store.page(status, urg, PAGE_SIZE, offset)
+            if rows:
+                st.caption(f"{offset + 1}–{offset + len(rows)} de {n} tickets")
+                st.markdown(render_page(rows), unsafe_allow_html=True)
+            else: st.info("Nenhum ticket com esses filtros.")
 
 @st.fragment
+@track_tab("sales")
 def render_sales_tab():
     st.write("")
-    if os.path.exists('data/vendas_restaurante.csv'):
-        df_v = pd.read_csv('data/vendas_restaurante.csv')
-        itens = [x.strip() for i in df_v['itens'] for x in str(i).split('+')]
-        top = Counter(itens).most_common(1)[0][0] if itens else "N/A"
+    df_v = load_sales(columns=['valor_total'])
+    if df_v is not None:
+        top = get_sales_index().top_item or "N/A"
         
         c1, c2, c3 = st.columns(3)
         c1.markdown(f"""<div class="metric-box"><small>FATURAMENTO</small><h3>R$ {df_v['valor_total'].sum():.2f}</h3></div>""", unsafe_allow_html=True)
@@ -269,40 +296,55 @@ def render_sales_tab():
             st.markdown(f"""<div class="css-card"><h4 style="color:#EA1D2C;">🔥 Gerador de Combos</h4><p>Crie 5 estratégias para vender mais <b>{top}</b>.</p></div>""", unsafe_allow_html=True)
             
             if st.button("✨ GERAR 5 COMBOS PROMOCIONAIS"):
-                with st.spinner("Criando estratégias..."):
-                    prompt = f"Crie 5 sugestões de COMBOS promocionais diferentes e criativos envolvendo {top}. Formato lista markdown simples."
-                    res = _safe_generate(prompt)
-                    st.success("Estratégias geradas!")
-                    st.markdown(f"""<div class="css-card" style="background:#FFF5F5 !important;">{res}</div>""", unsafe_allow_html=True)
+                status = st.empty()
+                status.info("Criando estratégias...")
+                prompt = f"Crie 5 sugestões de COMBOS promocionais diferentes e criativos envolvendo {top}. Formato lista markdown simples."
+                stream_into(st.empty(), _safe_stream(prompt), lambda t: f"""<div class="css-card" style="background:#FFF5F5 !important;">{t}</div>""")
+                status.success("Estratégias geradas!")
         
         with c_tb:
-            st.dataframe(df_v, width=None, height=400, use_container_width=True)
+            offset = pager("Página", len(df_v), SALES_PAGE, "sales_page")
+            st.dataframe(load_sales().iloc[offset:offset + SALES_PAGE], width=None, height=400, use_container_width=True)
 
 @st.fragment
+@track_tab("crm")
 def render_crm_tab():
     st.write("")
-    if os.path.exists('data/vendas_restaurante.csv'):
-        df_v = pd.read_csv('data/vendas_restaurante.csv')
+    df_v = load_sales(columns=['cliente'])
+    if df_v is not None:
         if 'cliente' in df_v.columns:
             c_l, c_r = st.columns([1.2, 1])
+            with c_r: phone = st.empty()
             with c_l:
                 st.markdown("### 🎯 Sniper CRM")
                 st.markdown("Selecione um cliente para enviar uma oferta única e personalizada.")
                 cli = st.selectbox("Base de Clientes:", df_v['cliente'].unique())
-                itens_c = [x.strip() for i in df_v[df_v['cliente']==cli]['itens'] for x in str(i).split('+')]
-                fav = Counter(itens_c).most_common(1)[0][0] if itens_c else "?"
+                fav = get_sales_index().favorite(cli) or "?"
                 st.info(f"Prato favorito: **{fav}**")
                 
                 if st.button("🚀 DISPARAR OFERTA ÚNICA"):
                     prompt = f"Aja como iFood. Cliente: {cli}. Favorito: {fav}. Escreva 1 notificação push curta, urgente e irresistível com emoji. Texto puro apenas."
-                    res = _safe_generate(prompt)
+                    res = stream_into(phone, _safe_stream(prompt), lambda t: render_phone(fav, t))
                     st.session_state['crm_push'] = {'msg': res, 'item': fav}
+
+                st.markdown("---")
+                st.markdown(f"**📣 Campanha em massa:** um push personalizado para cada um dos {df_v['cliente'].nunique()} clientes.")
+                if st.button("📣 DISPARAR CAMPANHA PARA TODA A BASE"):
+                    bar = st.progress(0.0, text="Preparando campanha...")
+                    runner = CampaignRunner(model, safety, CAMPAIGN_OUT, max_workers=CAMPAIGN_WORKERS, rpm=CAMPAIGN_RPM, cache=llm_cache)
+                    p = None
+                    for p in runner.run():
+                        bar.progress(p['written'] / max(p['total'], 1), text=f"{p['written']}/{p['total']} pushes gerados")
+                    bar.empty()
+                    if p is None: st.info(f"Campanha já concluída para toda a base ({CAMPAIGN_OUT}).")
+                    elif p['written'] < p['total']: st.warning(f"⚠️ IA Offline: {p['total'] - p['written']} cliente(s) sem push. Rode de novo para retomar.")
+                    else: st.success(f"Campanha salva em {CAMPAIGN_OUT} ({p['written']} novos pushes).")
             
-            with c_r:
-                push_data = st.session_state.get('crm_push', {'msg': 'Aguardando disparo...', 'item': 'IFOOD'})
-                st.markdown(render_phone(push_data['item'], push_data['msg']), unsafe_allow_html=True)
+            push_data = st.session_state.get('crm_push', {'msg': 'Aguardando disparo...', 'item': 'IFOOD'})
+            phone.markdown(render_phone(push_data['item'], push_data['msg']), unsafe_allow_html=True)
 
 @st.fragment
+@track_tab("chat")
 def render_chat_tab():
     c_left, c_right = st.columns([2, 1])
     with c_left:
@@ -311,35 +353,29 @@ def render_chat_tab():
         if 'chat_history' not in st.session_state: st.session_state['chat_history'] = []
 
         # --- CORREÇÃO DE LAG: IMUTABILIDADE ---
+        # Callbacks só registram a pergunta; a resposta é gerada em streaming no corpo do fragmento
         def on_submission():
             txt = st.session_state.get("chat_input_w")
             if txt:
                 st.session_state['chat_history'] = st.session_state['chat_history'] + [{'role': 'user', 'text': txt}]
-                ctx = ""
-                if os.path.exists('data/vendas_restaurante.csv'): 
-                    ctx = pd.read_csv('data/vendas_restaurante.csv').tail(30).to_string(index=False)
-                resp = _safe_generate(f"Dados: {ctx}. Pergunta: {txt}. Responda curto e com emojis.")
-                st.session_state['chat_history'] = st.session_state['chat_history'] + [{'role': 'assistant', 'text': resp}]
+                st.session_state['chat_pending'] = txt
                 st.session_state.chat_input_w = ""
 
         def click_suggestion(sugestao):
-            st.session_state.chat_input_w = sugestao 
             st.session_state['chat_history'] = st.session_state['chat_history'] + [{'role': 'user', 'text': sugestao}]
-            ctx = ""
-            if os.path.exists('data/vendas_restaurante.csv'): 
-                ctx = pd.read_csv('data/vendas_restaurante.csv').tail(30).to_string(index=False)
-            resp = _safe_generate(f"Dados: {ctx}. Pergunta: {sugestao}. Responda curto e com emojis.")
-            st.session_state['chat_history'] = st.session_state['chat_history'] + [{'role': 'assistant', 'text': resp}]
+            st.session_state['chat_pending'] = sugestao
             st.session_state.chat_input_w = ""
 
         st.text_input("Digite sua pergunta:", key="chat_input_w", on_change=on_submission)
         st.button("Enviar", on_click=on_submission)
 
+        pending = st.session_state.pop('chat_pending', None)
+        live = st.empty()  # resposta nova fica no topo (histórico é exibido do mais recente)
         for msg in reversed(st.session_state['chat_history']):
-            align = "right" if msg['role'] == 'user' else "left"
-            bg = "#F3F4F6" if msg['role'] == 'user' else "#FFF0F0"
-            color = "#333" if msg['role'] == 'user' else "#EA1D2C"
-            st.markdown(f"""<div style="text-align:{align}; margin-bottom:8px;"><span style="background:{bg}; color:{color}; padding:8px 14px; border-radius:12px; display:inline-block; font-size:0.9rem; font-weight:500;">{msg['text']}</span></div>""", unsafe_allow_html=True)
+            st.markdown(render_chat_bubble(msg), unsafe_allow_html=True)
+        if pending:
+            resp = stream_into(live, answer_stream(pending, _safe_stream), lambda t: render_chat_bubble({'role': 'assistant', 'text': t}))
+            st.session_state['chat_history'] = st.session_state['chat_history'] + [{'role': 'assistant', 'text': resp}]
 
     with c_right:
         st.info("💡 **Sugestões:**")
@@ -358,6 +394,23 @@ with tab_vend: render_sales_tab()
 with tab_crm: render_crm_tab()
 with tab_chat: render_chat_tab()
 
+# --- DIAGNÓSTICOS (oculto: abra com ?diag=1 na URL) ---
+def render_diagnostics():
+    with st.expander("🩺 Diagnósticos", expanded=True):
+        st.markdown("**Chamadas à IA por aba**")
+        st.dataframe(METRICS.summary(), use_container_width=True)
+        if hasattr(model, "health"):
+            st.markdown("**Saúde dos modelos (roteador)**")
+            st.dataframe([{'modelo': n, **h} for n, h in model.health().items()], use_container_width=True)
+        st.markdown(f"**Cache de respostas:** {llm_cache.stats()}")
+        st.markdown("**Últimas chamadas**")
+        st.dataframe(list(reversed(METRICS.recent)), use_container_width=True, height=250)
+        prom = METRICS.export_prometheus()
+        st.download_button("⬇️ Exportar métricas (Prometheus)", prom, file_name="genius_metrics.prom", mime="text/plain")
+        st.code(prom, language="text")
+
+if st.query_params.get("diag") == "1": render_diagnostics()
+
 # --- JAVASCRIPT: CÁLCULO MATEMÁTICO PARA CENTRALIZAÇÃO ---
 # Calcula o scrollLeft necessário para colocar o elemento no centro exato
 components.html("""
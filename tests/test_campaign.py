@@ -0,0 +1,47 @@
+import csv
+import json
+import pandas as pd
+from genius.campaign import CampaignRunner, done_customers
+from genius.fake import FakeModel, default_responder
+
+
+def _favs(n, start=0):
+    return pd.DataFrame({'cliente': [f"Cliente {i}" for i in range(start, n)],
+                         'favorito': ["Pizza" if i % 2 else "Sushi" for i in range(start, n)]})
+
+
+def _rows(path):
+    with open(path, newline="", encoding="utf-8") as f: return list(csv.DictReader(f))
+
+
+def _runner(path, responder=default_responder):
+    return CampaignRunner(FakeModel(latency=0, responder=responder), out_path=str(path), max_workers=2, rpm=0,
+                          group_size=10)
+
+
+def test_resume_from_checkpoint(tmp_path):
+    out = tmp_path / "campanha.csv"
+    progress = list(_runner(out).run(_favs(25)))
+    assert progress[-1]['written'] == 25 and len(_rows(out)) == 25
+    # Base cresceu: a segunda rodada só gera para os 35 novos
+    progress = list(_runner(out).run(_favs(60)))
+    assert progress[-1] == {'written': 35, 'total': 35, 'skipped': 25}
+    rows = _rows(out)
+    assert len(rows) == 60 and len({r['cliente'] for r in rows}) == 60
+    assert done_customers(str(out)) == {f"Cliente {i}" for i in range(60)}
+    assert list(_runner(out).run(_favs(60))) == []  # nada a fazer
+
+
+def test_missing_clients_fall_back_to_single_prompt(tmp_path):
+    prompts = []
+
+    def responder(prompt):
+        prompts.append(prompt)
+        if "CLIENTES:" not in prompt: return f"Push individual ({prompt.split('Cliente: ')[1].split('.')[0]})"
+        items = json.loads(default_responder(prompt))
+        return json.dumps(items[1:], ensure_ascii=False)  # a resposta em lote esquece o primeiro cliente
+
+    rows = _runner(tmp_path / "c.csv", responder).run_group("Pizza", ["Ana", "Bia", "Caio"])
+    assert [r['cliente'] for r in rows] == ["Ana", "Bia", "Caio"]
+    assert rows[0]['push'] == "Push individual (Ana)"
+    assert len(prompts) == 2
@@ -0,0 +1,56 @@
+import pytest
+
+pytest.importorskip("pyarrow")
+from genius.columnar import ParquetTable
+from genius.data import SALES_DTYPES
+
+HEADER = "id_pedido,itens,valor_total,cliente\n"
+
+
+def _rows(start, stop, cliente, item="Pizza"):
+    return "".join(f"{i},{item} + Refri,10.0,{cliente}{i}\n" for i in range(start, stop))
+
+
+def test_append_across_partitions(tmp_path):
+    p = tmp_path / "vendas.csv"
+    p.write_text(HEADER + _rows(0, 10, "Ana"), encoding="utf-8")
+    t = ParquetTable(str(p), SALES_DTYPES, str(tmp_path / "store"))
+    assert len(t.load()) == 10
+    with open(p, "a", encoding="utf-8") as f: f.write(_rows(10, 400, "Novo"))  # > 127 categorias novas
+    df = t.load(['id_pedido', 'cliente', 'itens_lista'])
+    assert len(df) == 400 and df['cliente'].iloc[-1] == "Novo399"
+    assert list(df['itens_lista'].iloc[0]) == ["Pizza", "Refri"]
+    # Processo novo: lê só as partições, com todas juntas
+    fresh = ParquetTable(str(p), SALES_DTYPES, str(tmp_path / "store"))
+    assert len(fresh.load()) == 400 and fresh.reloads == 1
+
+
+def test_partial_row_waits_for_newline(tmp_path):
+    p = tmp_path / "vendas.csv"
+    p.write_text(HEADER + _rows(0, 3, "Ana"), encoding="utf-8")
+    t = ParquetTable(str(p), SALES_DTYPES, str(tmp_path / "store"))
+    t.load()
+    with open(p, "a", encoding="utf-8") as f: f.write("3,Pizza,10.0,Bo")
+    assert len(t.load()) == 3
+    with open(p, "a", encoding="utf-8") as f: f.write("b\n")
+    assert list(t.load()['cliente'])[-1] == "Bob"
+
+
+def test_projection_reuses_full_frame(tmp_path):
+    p = tmp_path / "vendas.csv"
+    p.write_text(HEADER + _rows(0, 5, "Ana"), encoding="utf-8")
+    t = ParquetTable(str(p), SALES_DTYPES, str(tmp_path / "store"))
+    full = t.load()
+    assert list(t.load(['cliente'])['cliente']) == list(full['cliente'])
+    assert list(t._frames) == [None]
+
+
+def test_first_ingest_skips_partial_row(tmp_path):
+    p = tmp_path / "vendas.csv"
+    p.write_text(HEADER + _rows(0, 2, "Ana") + "2,Pizza,50.0,Bo", encoding="utf-8")
+    t = ParquetTable(str(p), SALES_DTYPES, str(tmp_path / "store"))
+    assert len(t.load()) == 2
+    with open(p, "a", encoding="utf-8") as f: f.write("b\n3,Salada,20.0,Caio\n")
+    assert list(t.load()['cliente'])[-2:] == ["Bob", "Caio"]
+    # O manifesto persistido também não inclui a linha cortada
+    assert list(ParquetTable(str(p), SALES_DTYPES, str(tmp_path / "store")).load()['cliente'])[-2:] == ["Bob", "Caio"]
@@ -0,0 +1,68 @@
+import os
+import pytest
+from genius.data import CsvTable, SALES_DTYPES
+
+HEADER = "id_pedido,itens,valor_total,cliente\n"
+
+
+def _write(path, text, mode="w"):
+    with open(path, mode, encoding="utf-8") as f: f.write(text)
+
+
+def test_append_reads_only_new_rows(tmp_path):
+    p = tmp_path / "vendas.csv"
+    _write(p, HEADER + "1,Hamburguer,35.0,Ana\n")
+    t = CsvTable(str(p), SALES_DTYPES)
+    assert len(t.load()) == 1
+    _write(p, "2,Pizza,50.0,Bia\n", "a")
+    df = t.load()
+    assert list(df['cliente']) == ["Ana", "Bia"]
+    assert t.reloads == 1 and str(df['cliente'].dtype) == "category"
+
+
+def test_partial_row_waits_for_newline(tmp_path):
+    p = tmp_path / "vendas.csv"
+    _write(p, HEADER + "1,Hamburguer,35.0,Ana\n")
+    t = CsvTable(str(p), SALES_DTYPES)
+    t.load()
+    _write(p, "2,Pizza,50.0,Bo", "a")  # escritor no meio da linha
+    assert len(t.load()) == 1
+    _write(p, "b\n3,Salada,20.0,Caio\n", "a")
+    df = t.load()
+    assert list(df['cliente']) == ["Ana", "Bob", "Caio"]
+    assert t.reloads == 1
+
+
+def test_rewrite_with_same_header_reloads(tmp_path):
+    p = tmp_path / "vendas.csv"
+    _write(p, HEADER + "1,Hamburguer,35.0,Ana\n")
+    t = CsvTable(str(p), SALES_DTYPES)
+    t.load()
+    _write(p, HEADER + "9,Pizza,50.0,Zeca\n10,Salada,20.0,Lia\n")
+    os.utime(p, ns=(1, 1))
+    df = t.load()
+    assert list(df['id_pedido']) == [9, 10]
+    assert t.reloads == 2
+
+
+def test_first_load_skips_partial_row(tmp_path):
+    p = tmp_path / "vendas.csv"
+    _write(p, HEADER + "1,Hamburguer,35.0,Ana\n2,Pizza,50.0,Bo")
+    t = CsvTable(str(p), SALES_DTYPES)
+    assert list(t.load()['cliente']) == ["Ana"]
+    _write(p, "b\n3,Salada,20.0,Caio\n", "a")
+    assert list(t.load()['cliente']) == ["Ana", "Bob", "Caio"]
+
+
+def test_failed_parse_does_not_skip_rows(tmp_path, monkeypatch):
+    p = tmp_path / "vendas.csv"
+    _write(p, HEADER + "1,Hamburguer,35.0,Ana\n")
+    t = CsvTable(str(p), SALES_DTYPES)
+    t.load()
+    _write(p, "2,Pizza,50.0,Bia\n", "a")
+
+    def broken(buf): raise ValueError("parse")
+    monkeypatch.setattr(t, "_read", broken)
+    with pytest.raises(ValueError): t.load()
+    monkeypatch.undo()
+    assert list(t.load()['cliente']) == ["Ana", "Bia"]
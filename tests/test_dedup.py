@@ -0,0 +1,64 @@
+from genius.dedup import TicketDeduper, canonical
+from genius.fake import FakeModel, default_responder
+from genius.triage import TriageEngine
+
+COLD = "Meu lanche chegou muito frio e atrasado, quero reembolso agora"
+COLD_NEAR = "Meu lanche chegou muito frio e atrasado, quero um reembolso agora"
+OTHER = "Onde eu insiro o cupom de primeira compra?"
+
+
+def test_canonical_ignores_numbers_case_and_punctuation():
+    assert canonical("Pedido #123 veio FRIO!") == canonical("pedido 456 veio frio") == "pedido 0 veio frio"
+
+
+def test_exact_and_near_duplicates_share_a_representative():
+    d = TicketDeduper(threshold=0.6)
+    out = d.assign([(1, COLD), (2, OTHER), (3, COLD), (4, COLD_NEAR), (5, "Pedido #99: " + OTHER)])
+    assert out[0] == (None, 1.0) and out[1] == (None, 1.0)
+    assert out[2] == (1, 1.0)
+    assert out[3][0] == 1 and 0.6 <= out[3][1] < 1.0
+    assert out[4][0] == 2
+    assert d.stats()['representantes'] == 2
+
+
+def test_threshold_boundary():
+    sim = TicketDeduper(threshold=0.0).assign([(1, COLD), (2, COLD_NEAR)])[1][1]
+    assert TicketDeduper(threshold=sim).assign([(1, COLD), (2, COLD_NEAR)])[1] == (1, sim)
+    assert TicketDeduper(threshold=sim + 0.01).assign([(1, COLD), (2, COLD_NEAR)])[1] == (None, 1.0)
+
+
+def test_forget_removes_representative():
+    d = TicketDeduper()
+    d.assign([(1, COLD)])
+    d.forget(1)
+    assert d.assign([(2, COLD)]) == [(None, 1.0)]
+    assert list(d.reps) == [2]
+
+
+def _engine(responder):
+    return TriageEngine(FakeModel(latency=0, responder=responder), max_workers=1, retries=0, backoff=0,
+                        dedup_threshold=0.8)
+
+
+def test_engine_propagates_verdict_to_group():
+    prompts = []
+    def responder(p):
+        prompts.append(p)
+        return default_responder(p)
+    results = {r['id_ticket']: r for r in _engine(responder).run([(1, COLD), (2, COLD), (3, OTHER), (4, COLD)])}
+    assert len(prompts) == 2 and all(r['ok'] for r in results.values())
+    assert results[2]['dedup_of'] == 1 and results[4]['dedup_of'] == 1
+    assert results[2]['tag'] == results[1]['tag'] and 'dedup_of' not in results[3]
+
+
+def test_failed_representative_falls_back_for_group():
+    calls = []
+    def responder(p):
+        calls.append(p)
+        if len(calls) == 1: raise RuntimeError("falha no representante")
+        return default_responder(p)
+    engine = _engine(responder)
+    results = {r['id_ticket']: r for r in engine.run([(1, COLD), (2, COLD), (3, COLD)])}
+    assert not results[1]['ok']
+    assert results[2]['ok'] and results[3]['ok'] and 'dedup_of' not in results[2]
+    assert 1 not in engine.dedup.reps  # representante que falhou saiu do índice
@@ -0,0 +1,28 @@
+from genius.feed import PAGE_SIZE, page_count, render_page, ticket_card
+
+EVIL = '<script>alert("x")</script> & "aspas"'
+
+
+def test_done_card_escapes_every_field():
+    html = ticket_card({'id_ticket': '<b>7</b>', 'mensagem': EVIL, 'tag': '<i>URGENTE</i>', 'acao': EVIL,
+                        'resposta': EVIL, 'status': 'done'})
+    assert "<script>" not in html and "<b>7</b>" not in html and "<i>" not in html
+    assert "&lt;script&gt;alert(&quot;x&quot;)&lt;/script&gt; &amp; &quot;aspas&quot;" in html
+    assert "\n" not in html  # linha indentada viraria bloco de código no Markdown
+
+
+def test_pending_card_escapes_message_and_shows_status():
+    html = ticket_card({'id_ticket': 3, 'mensagem': EVIL, 'status': 'pending', 'urgency': 'URGENTE'})
+    assert "<script>" not in html and "NA FILA" in html and "tag-URGENTE" in html
+
+
+def test_render_page_joins_cards():
+    rows = [{'id_ticket': i, 'mensagem': "oi", 'status': 'pending'} for i in range(3)]
+    assert render_page(rows).count("Ticket #") == 3
+
+
+def test_page_count():
+    assert page_count(0) == 1
+    assert page_count(PAGE_SIZE) == 1
+    assert page_count(PAGE_SIZE + 1) == 2
+    assert page_count(95, 10) == 10
@@ -0,0 +1,30 @@
+from google.api_core import exceptions as ga_exceptions
+from genius.cache import ResponseCache
+from genius.fake import FakeModel, FakeResponse
+from genius.llm import generate_stream
+
+
+class BrokenStream:
+    model_name = "models/fake-flash"
+
+    def __init__(self):
+        self.calls = 0
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        self.calls += 1
+        yield FakeResponse("Primeira parte ")
+        raise ga_exceptions.ServiceUnavailable("caiu no meio")
+
+
+def test_stream_error_midway_is_not_cached():
+    cache, model = ResponseCache(":memory:"), BrokenStream()
+    assert "".join(generate_stream(model, "oi", cache=cache, backoff=0)) == "Primeira parte "
+    assert "".join(generate_stream(model, "oi", cache=cache, backoff=0)) == "Primeira parte "
+    assert model.calls == 2 and cache.hits == 0
+
+
+def test_complete_stream_is_cached():
+    cache, model = ResponseCache(":memory:"), FakeModel(latency=0, chunk_latency=0)
+    first = "".join(generate_stream(model, "oi", cache=cache))
+    assert "".join(generate_stream(model, "oi", cache=cache)) == first.strip()
+    assert model.calls == 1 and cache.hits == 1
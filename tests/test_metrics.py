@@ -0,0 +1,29 @@
+from genius.llm import OFFLINE, OFFLINE_ERROR, generate, generate_stream
+from genius.metrics import METRICS, Metrics, tab_context
+
+
+def test_summary_and_prometheus_export():
+    m = Metrics()
+    m.record(0.2, 0.05, 10, 20, tab="chat", model="flash")
+    m.record(0.01, cache_hit=True, tab="chat")
+    m.record(1.5, error="ResourceExhausted", tab="support")
+    rows = {r['aba']: r for r in m.summary()}
+    assert rows['chat'] == {'aba': "chat", 'chamadas': 2, 'cache_hits': 1, 'erros': 0, 'latencia_media_s': 0.105,
+                            'ttfb_medio_s': 0.05, 'tokens_prompt': 10, 'tokens_saida': 20}
+    assert rows['support']['erros'] == 1
+    text = m.export_prometheus()
+    assert 'genius_llm_calls_total{tab="chat",outcome="cache"} 1' in text
+    assert 'genius_llm_errors_total{tab="support",error="ResourceExhausted"} 1' in text
+    assert 'genius_llm_tokens_total{tab="chat",kind="output"} 20' in text
+    assert 'genius_llm_latency_seconds_bucket{tab="chat",le="0.25"} 2' in text
+    assert 'genius_llm_latency_seconds_bucket{tab="support",le="+Inf"} 1' in text
+    assert 'genius_llm_ttfb_seconds_count{tab="chat"} 1' in text
+
+
+def test_offline_calls_are_recorded():
+    METRICS.reset()
+    with tab_context("crm"):
+        assert generate(None, "oi") == OFFLINE
+        assert list(generate_stream(None, "oi")) == [OFFLINE]
+    assert METRICS.errors[("crm", OFFLINE_ERROR)] == 2
+    assert {r['aba']: r['erros'] for r in METRICS.summary()} == {"crm": 2}
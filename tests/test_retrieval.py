@@ -0,0 +1,55 @@
+import pandas as pd
+import pytest
+from genius.data import SALES_DTYPES, CsvTable
+from genius.retrieval import (STOPWORDS, Bm25Index, answer_from_aggregates, order_docs, order_tokens, ticket_docs,
+                              ticket_tokens, tokenize)
+
+CSV = """id_pedido,itens,valor_total,cliente
+1,Hamburguer + Refri,35.00,João Silva
+2,Pizza M,50.00,Maria Oliveira
+3,Hamburguer,25.00,Maria Oliveira
+"""
+
+
+@pytest.fixture
+def sales(tmp_path):
+    p = tmp_path / "vendas.csv"
+    p.write_text(CSV, encoding="utf-8")
+    return str(p)
+
+
+def test_global_aggregates(sales):
+    assert answer_from_aggregates("Qual o faturamento total?", sales) == "💰 Faturamento total: R$ 110.00 em 3 pedidos."
+    assert answer_from_aggregates("Quantos pedidos temos?", sales) == "📦 Total de pedidos: 3."
+
+
+@pytest.mark.parametrize("question", ["faturamento da Maria", "receita do hamburguer", "Quantos pedidos a Maria fez?",
+                                      "Qual o ticket médio do Silva?"])
+def test_named_cliente_or_item_falls_through(sales, question):
+    assert answer_from_aggregates(question, sales) is None
+
+
+def test_domain_words_in_names_do_not_block_aggregates(tmp_path):
+    # Base do benchmark: clientes chamados "Cliente N"
+    p = tmp_path / "vendas.csv"
+    p.write_text("id_pedido,itens,valor_total,cliente\n1,Pizza,10.00,Cliente 1\n2,Pizza,30.00,Cliente 12\n",
+                 encoding="utf-8")
+    assert answer_from_aggregates("Melhor cliente?", str(p)) == "🏆 Melhor cliente: Cliente 12 (R$ 30.00 em 1 pedidos)"
+    assert answer_from_aggregates("top 5 clientes", str(p)).startswith("🏆 Ranking de clientes:")
+    assert answer_from_aggregates("faturamento do Cliente 12", str(p)) is None
+
+
+def test_batched_tokens_match_per_document_tokenize(sales):
+    df = CsvTable(sales, SALES_DTYPES).load()
+    tickets = pd.DataFrame({'id_ticket': [1, 2], 'mensagem_cliente': ["Não recebi o pedido!", "Ótimo, obrigado"]})
+    for docs, toks in ((order_docs(df), order_tokens(df)), (ticket_docs(tickets), ticket_tokens(tickets))):
+        assert [tokenize(d) for d in docs] == [[w for w in t if w not in STOPWORDS] for t in toks]
+
+
+def test_bm25_finds_named_order():
+    bm = Bm25Index()
+    bm.add(["Pedido 1: Pizza | cliente Ana", "Pedido 2: Sushi | cliente Bia"])
+    bm.add(["Pedido 3: Açaí | cliente Caio"])
+    assert bm.search("sushi da Bia") == [1]
+    assert bm.search("acai") == [2]
+    assert bm.search("xyz") == []
@@ -0,0 +1,53 @@
+import random
+from genius.fake import FakeModel
+from genius.router import ModelRouter
+
+SHORT = "Classifique: pedido atrasado"
+COMPLEX = "Explique passo a passo uma estratégia de retenção"
+
+
+def _router(**kw):
+    return ModelRouter(["models/flash-a", "models/flash-b", "models/pro"], lambda n: FakeModel(latency=0, model_name=n), **kw)
+
+
+def _feed(router, name, latency, errors, n=20):
+    for i in range(n): router.stats[name].record(latency, i >= errors)
+
+
+def test_tier_by_prompt_complexity():
+    r = _router()
+    assert r.pick(SHORT).startswith("models/flash")
+    assert r.pick(COMPLEX) == "models/pro"
+
+
+def test_fastest_healthy_model_first():
+    r = _router()
+    _feed(r, "models/flash-a", 0.5, 0)
+    _feed(r, "models/flash-b", 0.2, 0)
+    assert r.candidates(SHORT)[:2] == ["models/flash-b", "models/flash-a"]
+
+
+def test_no_data_model_ranks_after_measured_healthy():
+    r = _router()
+    _feed(r, "models/flash-a", 0.5, 0)
+    assert r.candidates(SHORT)[:2] == ["models/flash-a", "models/flash-b"]
+
+
+def test_failing_model_loses_traffic():
+    r = ModelRouter(["models/flash-a", "models/flash-b"], lambda n: None)
+    _feed(r, "models/flash-a", 0.1, 9)  # rápido, mas 45% de erro
+    _feed(r, "models/flash-b", 0.4, 0)
+    rng = random.Random(0)
+    picks = {"models/flash-a": 0, "models/flash-b": 0}
+    for _ in range(200):
+        name = r.pick(SHORT)
+        picks[name] += 1
+        r.stats[name].record(0.1 if name.endswith("a") else 0.4, name.endswith("b") or rng.random() > 0.43)
+    assert picks["models/flash-b"] == 200
+
+
+def test_few_failures_do_not_condemn_new_model():
+    r = _router()
+    _feed(r, "models/flash-a", 0.5, 2, n=3)
+    _feed(r, "models/flash-b", 0.9, 0)
+    assert r.candidates(SHORT)[0] == "models/flash-a"
@@ -0,0 +1,33 @@
+import pandas as pd
+import pytest
+from genius.data import SUPPORT_PATH
+from genius.rules import MIN_CONFIDENCE, classify, label
+
+
+def test_sample_tickets():
+    df = pd.read_csv(SUPPORT_PATH)
+    got = dict(zip(df['id_ticket'], map(label, df['mensagem_cliente'])))
+    assert got == {1: "URGENTE", 2: "BAIXA", 3: "BAIXA", 4: "URGENTE", 5: "URGENTE"}
+
+
+@pytest.mark.parametrize("msg, expected", [
+    ("A carne veio crua!", "URGENTE"),
+    ("Meu lanche chegou frio e atrasado", "MEDIA"),
+    ("O refri veio quente", "MEDIA"),
+    ("O milkshake chegou completamente quente", "MEDIA"),
+    ("Parabéns, adorei o atendimento", "BAIXA"),
+])
+def test_clear_signals(msg, expected):
+    assert label(msg) == expected
+
+
+@pytest.mark.parametrize("msg", [
+    "O lanche chegou quente e gostoso",  # "quente" solto não é reclamação
+    "Obrigado, mas meu pedido não chegou",  # agradecimento no fim de uma reclamação
+    "Ótimo, e agora?",
+    "Quero falar com alguém",  # sem sinal nenhum
+    "Elogio ao entregador, mas a comida veio fria",  # sinais conflitantes
+])
+def test_weak_or_ambiguous_go_to_the_model(msg):
+    assert label(msg) is None
+    assert classify(msg)[1] < MIN_CONFIDENCE
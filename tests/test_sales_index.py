@@ -0,0 +1,42 @@
+import io
+import random
+from collections import Counter
+import pandas as pd
+from genius.data import SALES_DTYPES, concat_frames
+from genius.sales_index import SalesIndex
+
+ITEMS = ["Pizza", "Refri", "Sushi", "Batata Frita", "Açaí"]
+CLIENTES = ["Ana", "Bia", "Caio", "João Silva"]
+
+
+def _chunk(rng, start, n):
+    lines = [f"{i},{' + '.join(rng.sample(ITEMS, rng.randint(1, 3)))},10.0,{rng.choice(CLIENTES)}" for i in range(start, start + n)]
+    return pd.read_csv(io.StringIO("id_pedido,itens,valor_total,cliente\n" + "\n".join(lines)), dtype=SALES_DTYPES)
+
+
+def _expected(df):
+    items = [x.strip() for c in df['itens'].astype(str) for x in c.split('+')]
+    per_client = {}
+    for cli, combo in zip(df['cliente'].astype(str), df['itens'].astype(str)):
+        per_client.setdefault(cli, Counter()).update(x.strip() for x in combo.split('+'))
+    return Counter(items).most_common(1)[0][0], {c: cnt.most_common(1)[0][0] for c, cnt in per_client.items()}
+
+
+def test_incremental_update_matches_full_counter():
+    rng = random.Random(7)
+    idx, df = SalesIndex(), None
+    for step in range(5):
+        new = _chunk(rng, step * 40, 40)
+        df = new if df is None else concat_frames(df, new)
+        idx.update(df)
+        top, favs = _expected(df)
+        assert idx.top_item == top
+        assert {c: idx.favorite(c) for c in favs} == favs
+
+
+def test_ties_follow_first_occurrence():
+    df = pd.read_csv(io.StringIO("id_pedido,itens,valor_total,cliente\n1,Sushi + Pizza,1,Ana\n2,Pizza + Sushi,1,Ana\n"),
+                     dtype=SALES_DTYPES)
+    idx = SalesIndex()
+    idx.update(df)
+    assert idx.top_item == "Sushi" and idx.favorite("Ana") == "Sushi"
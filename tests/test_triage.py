@@ -0,0 +1,48 @@
+import json
+from genius.cache import ResponseCache
+from genius.fake import FakeModel, triage_responder
+from genius.triage import TriageEngine
+
+TICKETS = [(1, "A carne veio crua!"), (2, "Meu lanche chegou frio."), (3, "Onde coloco o cupom?")]
+
+
+def _dropping(drop):
+    """Responder que omite `drop` das respostas em lote (o ticket volta para a fila)."""
+    prompts = []
+
+    def responder(prompt):
+        prompts.append(prompt)
+        raw = triage_responder(prompt)
+        if "TICKETS:" not in prompt: return raw
+        return json.dumps([it for it in json.loads(raw) if str(it['id_ticket']) != str(drop)], ensure_ascii=False)
+    return responder, prompts
+
+
+def test_batch_requeue_then_single_prompt():
+    responder, prompts = _dropping(2)
+    engine = TriageEngine(FakeModel(latency=0, responder=responder), max_workers=1, batch_size=3, max_requeue=2, backoff=0)
+    results = {r['id_ticket']: r for r in engine.run(TICKETS)}
+    assert all(r['ok'] for r in results.values()) and set(results) == {1, 2, 3}
+    assert results[1]['tag'] == "URGENTE" and results[2]['tag'] == "MEDIA"
+    # 1 lote + 2 re-queues em lote + 1 prompt individual
+    assert sum("TICKETS:" in p for p in prompts) == 3 and len(prompts) == 4
+
+
+def test_batch_error_fails_every_ticket():
+    engine = TriageEngine(FakeModel(latency=0, fail_rate=1.0), max_workers=1, batch_size=3, retries=0, backoff=0)
+    results = list(engine.run(TICKETS))
+    assert len(results) == 3 and not any(r['ok'] for r in results)
+
+
+def test_rejected_batch_reply_is_not_cached():
+    responder, prompts = _dropping(2)
+    cache = ResponseCache(":memory:")
+    engine = TriageEngine(FakeModel(latency=0, responder=responder), max_workers=1, batch_size=3, max_requeue=2,
+                          backoff=0, cache=cache)
+    assert all(r['ok'] for r in engine.run(TICKETS))
+    assert len(prompts) == 4 and cache.hits == 0
+    # Lote completo e válido vai para o cache
+    engine = TriageEngine(FakeModel(latency=0), max_workers=1, batch_size=3, backoff=0, cache=cache)
+    list(engine.run(TICKETS[:2]))
+    list(engine.run(TICKETS[:2]))
+    assert cache.hits == 1
@@ -0,0 +1,70 @@
+from types import SimpleNamespace
+import pytest
+from genius import worker
+from genius.fake import FakeModel, default_responder
+from genius.worker import TriageStore, TriageWorker
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = SimpleNamespace(t=1000.0)
+    monkeypatch.setattr(worker, "time", SimpleNamespace(time=lambda: now.t))
+    return now
+
+
+def _support_csv(path, n):
+    path.write_text("id_ticket,mensagem_cliente\n" + "".join(f'{i},"Pedido {i} veio com problema"\n' for i in range(1, n + 1)),
+                    encoding="utf-8")
+    return str(path)
+
+
+def test_lease_and_backoff_cycle(clock):
+    store = TriageStore(":memory:", max_attempts=2, lease=60, backoff=10, retry_errors=None)
+    store.enqueue([(1, "a")])
+    assert store.claim(5) == [(1, "a")]
+    assert store.claim(5) == []  # lease vigente
+    clock.t += 61
+    assert store.claim(5) == [(1, "a")]  # lease vencido: volta para a fila
+    store.fail(1)
+    assert store.claim(5) == []  # backoff de 10s
+    clock.t += 10
+    assert store.claim(5) == [(1, "a")]
+    store.fail(1)
+    assert store.counts()['error'] == 1
+    assert store.requeue_errors(older_than=60) == 0
+    clock.t += 60
+    assert store.requeue_errors(older_than=60) == 1
+    assert store.claim(5) == [(1, "a")]
+
+
+def test_worker_pauses_on_outage_and_recovers(tmp_path, clock):
+    model = FakeModel(latency=0, chunk_latency=0, fail_rate=1.0)
+    store = TriageStore(":memory:", backoff=30, retry_errors=None)
+    w = TriageWorker(model, store=store, support_path=_support_csv(tmp_path / "suporte.csv", 40), claim_size=10,
+                     max_workers=4, retries=1, backoff=0)
+    assert w.poll_once() == 10  # um lote inteiro falhou: não drena o resto
+    assert store.counts()['pending'] == 40 and w.outages == 1
+    assert w.delay() == w.interval * 2
+    model.fail_rate = 0.0
+    w.poll_once()
+    assert store.counts()['done'] == 30 and w.outages == 0  # os 10 que falharam estão em backoff
+    clock.t += 30
+    w.poll_once()
+    assert store.counts()['done'] == 40
+
+
+def test_new_urgent_ticket_enters_between_claims(tmp_path, clock):
+    path = tmp_path / "suporte.csv"
+    seen = []
+
+    def responder(prompt):
+        seen.append(prompt)
+        if len(seen) == 1:
+            with open(path, "a", encoding="utf-8") as f: f.write('99,"A carne veio crua e passei mal"\n')
+        return default_responder(prompt)
+
+    w = TriageWorker(FakeModel(latency=0, chunk_latency=0, responder=responder), store=TriageStore(":memory:"),
+                     support_path=_support_csv(path, 5), claim_size=1, max_workers=1, retries=1, backoff=0)
+    w.poll_once()
+    assert w.store.counts()['done'] == 6
+    assert "crua" in seen[1]